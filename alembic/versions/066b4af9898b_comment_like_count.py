@@ -0,0 +1,34 @@
+"""comment like_count
+
+Revision ID: 066b4af9898b
+Revises: 7717bcaa509d
+Create Date: 2026-10-18 12:21:00.215627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '066b4af9898b'
+down_revision: Union[str, Sequence[str], None] = '7717bcaa509d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("comment", sa.Column("like_count", sa.Integer(), server_default="0", nullable=False))
+    # 按已有点赞回填计数
+    op.execute(
+        "UPDATE comment SET like_count = "
+        "(SELECT count(*) FROM comment_like WHERE comment_like.comment_id = comment.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("comment") as batch_op:
+        batch_op.drop_column("like_count")
@@ -0,0 +1,86 @@
+"""user stats and activity indexes
+
+Revision ID: 151ee90867c1
+Revises: 57ed7bfe3827
+Create Date: 2026-10-18 12:45:38.999749
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '151ee90867c1'
+down_revision: Union[str, Sequence[str], None] = '57ed7bfe3827'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("likes_given", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("likes_received", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_comment_user_id_created_at", "comment", ["user_id", "created_at"])
+    op.create_index("ix_comment_like_user_id_created_at", "comment_like", ["user_id", "created_at"])
+    op.execute(
+        "CREATE TRIGGER user_stats_comment_ai AFTER INSERT ON comment WHEN new.deleted_at IS NULL BEGIN "
+        "INSERT INTO user_stats(user_id, comment_count) VALUES (new.user_id, 1) "
+        "ON CONFLICT(user_id) DO UPDATE SET comment_count = comment_count + 1; END"
+    )
+    op.execute(
+        "CREATE TRIGGER user_stats_comment_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+        "UPDATE user_stats SET comment_count = comment_count - 1, likes_received = likes_received - old.like_count "
+        "WHERE user_id = old.user_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER user_stats_comment_tombstone AFTER UPDATE OF deleted_at ON comment "
+        "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+        "UPDATE user_stats SET comment_count = comment_count - 1, likes_received = likes_received - new.like_count "
+        "WHERE user_id = new.user_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER user_stats_like_count AFTER UPDATE OF like_count ON comment "
+        "WHEN new.deleted_at IS NULL AND new.like_count != old.like_count BEGIN "
+        "UPDATE user_stats SET likes_received = likes_received + new.like_count - old.like_count "
+        "WHERE user_id = new.user_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER user_stats_like_ai AFTER INSERT ON comment_like BEGIN "
+        "INSERT INTO user_stats(user_id, likes_given) VALUES (new.user_id, 1) "
+        "ON CONFLICT(user_id) DO UPDATE SET likes_given = likes_given + 1; END"
+    )
+    op.execute(
+        "CREATE TRIGGER user_stats_like_ad AFTER DELETE ON comment_like BEGIN "
+        "UPDATE user_stats SET likes_given = likes_given - 1 WHERE user_id = old.user_id; END"
+    )
+    # 按已有评论与点赞回填
+    op.execute(
+        "INSERT INTO user_stats (user_id, comment_count, likes_given, likes_received) "
+        "SELECT id, "
+        "(SELECT count(*) FROM comment WHERE comment.user_id = user.id AND deleted_at IS NULL), "
+        "(SELECT count(*) FROM comment_like WHERE comment_like.user_id = user.id), "
+        "(SELECT coalesce(sum(like_count), 0) FROM comment WHERE comment.user_id = user.id AND deleted_at IS NULL) "
+        "FROM user"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS user_stats_like_ad")
+    op.execute("DROP TRIGGER IF EXISTS user_stats_like_ai")
+    op.execute("DROP TRIGGER IF EXISTS user_stats_like_count")
+    op.execute("DROP TRIGGER IF EXISTS user_stats_comment_tombstone")
+    op.execute("DROP TRIGGER IF EXISTS user_stats_comment_ad")
+    op.execute("DROP TRIGGER IF EXISTS user_stats_comment_ai")
+    op.drop_index("ix_comment_like_user_id_created_at", table_name="comment_like")
+    op.drop_index("ix_comment_user_id_created_at", table_name="comment")
+    op.drop_table("user_stats")
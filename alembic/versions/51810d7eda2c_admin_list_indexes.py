@@ -0,0 +1,36 @@
+"""admin list indexes
+
+Revision ID: 51810d7eda2c
+Revises: 6b3a5e4d0785
+Create Date: 2026-10-18 12:25:23.661677
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '51810d7eda2c'
+down_revision: Union[str, Sequence[str], None] = '6b3a5e4d0785'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_comment_article_id_id", "comment", ["article_id", "id"], unique=False)
+    op.create_index("ix_comment_created_at", "comment", ["created_at"], unique=False)
+    op.create_index("ix_user_username", "user", ["username"], unique=False)
+    op.create_index("ix_user_is_premium_id", "user", ["is_premium", "id"], unique=False)
+    op.create_index("ix_user_is_superuser_id", "user", ["is_superuser", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_is_superuser_id", table_name="user")
+    op.drop_index("ix_user_is_premium_id", table_name="user")
+    op.drop_index("ix_user_username", table_name="user")
+    op.drop_index("ix_comment_created_at", table_name="comment")
+    op.drop_index("ix_comment_article_id_id", table_name="comment")
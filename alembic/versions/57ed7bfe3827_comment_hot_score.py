@@ -0,0 +1,41 @@
+"""comment hot score
+
+Revision ID: 57ed7bfe3827
+Revises: 75f33240a288
+Create Date: 2026-10-18 12:39:22.258123
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57ed7bfe3827'
+down_revision: Union[str, Sequence[str], None] = '75f33240a288'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # VIRTUAL 生成列可以直接 ALTER TABLE 添加，不重建 comment 表
+    op.add_column(
+        "comment",
+        sa.Column(
+            "hot_score",
+            sa.Float(),
+            sa.Computed("log10(max(like_count, 1)) + (julianday(created_at) - 2460676.5) * 86400 / 45000", persisted=False),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_comment_article_id_parent_id_hot", "comment", ["article_id", "parent_id", "hot_score", "id"])
+    op.create_index("ix_comment_article_id_parent_id_likes", "comment", ["article_id", "parent_id", "like_count", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_comment_article_id_parent_id_likes", table_name="comment")
+    op.drop_index("ix_comment_article_id_parent_id_hot", table_name="comment")
+    op.drop_column("comment", "hot_score")
@@ -0,0 +1,62 @@
+"""recompute article last_comment_at
+
+Revision ID: 69f332a32351
+Revises: 151ee90867c1
+Create Date: 2026-10-18 13:05:22.844939
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '69f332a32351'
+down_revision: Union[str, Sequence[str], None] = '151ee90867c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS article_stats_ad")
+    op.execute("DROP TRIGGER IF EXISTS article_stats_tombstone")
+    # 删掉的正好是最新一条时才重新取最后评论时间，没有剩余评论时为 NULL
+    op.execute(
+        "CREATE TRIGGER article_stats_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1, "
+        "last_comment_at = CASE WHEN old.created_at >= last_comment_at THEN "
+        "(SELECT max(created_at) FROM comment WHERE article_id = old.article_id AND deleted_at IS NULL) "
+        "ELSE last_comment_at END "
+        "WHERE article_id = old.article_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER article_stats_tombstone AFTER UPDATE OF deleted_at ON comment "
+        "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1, "
+        "last_comment_at = CASE WHEN new.created_at >= last_comment_at THEN "
+        "(SELECT max(created_at) FROM comment WHERE article_id = new.article_id AND deleted_at IS NULL) "
+        "ELSE last_comment_at END "
+        "WHERE article_id = new.article_id; END"
+    )
+    # 修正旧触发器留下的过时值
+    op.execute(
+        "UPDATE article_stats SET last_comment_at = "
+        "(SELECT max(created_at) FROM comment WHERE comment.article_id = article_stats.article_id AND deleted_at IS NULL)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS article_stats_ad")
+    op.execute("DROP TRIGGER IF EXISTS article_stats_tombstone")
+    op.execute(
+        "CREATE TRIGGER article_stats_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1 WHERE article_id = old.article_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER article_stats_tombstone AFTER UPDATE OF deleted_at ON comment "
+        "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1 WHERE article_id = new.article_id; END"
+    )
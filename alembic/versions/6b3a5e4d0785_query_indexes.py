@@ -0,0 +1,40 @@
+"""query indexes
+
+Revision ID: 6b3a5e4d0785
+Revises: 066b4af9898b
+Create Date: 2026-10-18 12:21:00.798051
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b3a5e4d0785'
+down_revision: Union[str, Sequence[str], None] = '066b4af9898b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_comment_article_id_parent_id_id", "comment", ["article_id", "parent_id", "id"], unique=False)
+    op.create_index("ix_comment_parent_id_id", "comment", ["parent_id", "id"], unique=False)
+    op.create_index("ix_comment_user_id_id", "comment", ["user_id", "id"], unique=False)
+    op.create_index("ix_comment_like_user_id_comment_id", "comment_like", ["user_id", "comment_id"], unique=False)
+    # 已被上面的复合索引覆盖（id 本身就是 rowid）
+    op.drop_index("ix_comment_article_id", table_name="comment")
+    op.drop_index("ix_comment_id", table_name="comment")
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_comment_id", "comment", ["id"], unique=False)
+    op.create_index("ix_comment_article_id", "comment", ["article_id"], unique=False)
+    op.drop_index("ix_comment_like_user_id_comment_id", table_name="comment_like")
+    op.drop_index("ix_comment_user_id_id", table_name="comment")
+    op.drop_index("ix_comment_parent_id_id", table_name="comment")
+    op.drop_index("ix_comment_article_id_parent_id_id", table_name="comment")
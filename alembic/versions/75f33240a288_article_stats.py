@@ -0,0 +1,57 @@
+"""article stats
+
+Revision ID: 75f33240a288
+Revises: c69b53985bea
+Create Date: 2026-10-18 12:35:59.752875
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '75f33240a288'
+down_revision: Union[str, Sequence[str], None] = 'c69b53985bea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "article_stats",
+        sa.Column("article_id", sa.String(), nullable=False),
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_comment_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("article_id"),
+    )
+    op.execute(
+        "CREATE TRIGGER article_stats_ai AFTER INSERT ON comment WHEN new.deleted_at IS NULL BEGIN "
+        "INSERT INTO article_stats(article_id, comment_count, last_comment_at) VALUES (new.article_id, 1, new.created_at) "
+        "ON CONFLICT(article_id) DO UPDATE SET comment_count = comment_count + 1, "
+        "last_comment_at = max(coalesce(last_comment_at, ''), excluded.last_comment_at); END"
+    )
+    op.execute(
+        "CREATE TRIGGER article_stats_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1 WHERE article_id = old.article_id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER article_stats_tombstone AFTER UPDATE OF deleted_at ON comment "
+        "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+        "UPDATE article_stats SET comment_count = comment_count - 1 WHERE article_id = new.article_id; END"
+    )
+    # 按已有评论回填
+    op.execute(
+        "INSERT INTO article_stats (article_id, comment_count, last_comment_at) "
+        "SELECT article_id, count(*), max(created_at) FROM comment WHERE deleted_at IS NULL GROUP BY article_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS article_stats_tombstone")
+    op.execute("DROP TRIGGER IF EXISTS article_stats_ad")
+    op.execute("DROP TRIGGER IF EXISTS article_stats_ai")
+    op.drop_table("article_stats")
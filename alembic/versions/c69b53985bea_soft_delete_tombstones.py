@@ -0,0 +1,35 @@
+"""soft delete tombstones
+
+Revision ID: c69b53985bea
+Revises: f7f406d10c40
+Create Date: 2026-10-18 12:30:55.686771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c69b53985bea'
+down_revision: Union[str, Sequence[str], None] = 'f7f406d10c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 直接 ALTER TABLE 加列，不用 batch 重建 comment 表，保留全文索引触发器
+    op.add_column("comment", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_comment_deleted_id", "comment", ["id"], sqlite_where=sa.text("deleted_at IS NOT NULL"))
+    op.add_column("user", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_user_deleted_id", "user", ["id"], sqlite_where=sa.text("deleted_at IS NOT NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_deleted_id", table_name="user")
+    op.drop_column("user", "deleted_at")
+    op.drop_index("ix_comment_deleted_id", table_name="comment")
+    op.drop_column("comment", "deleted_at")
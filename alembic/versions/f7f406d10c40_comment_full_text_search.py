@@ -0,0 +1,49 @@
+"""comment full text search
+
+Revision ID: f7f406d10c40
+Revises: 51810d7eda2c
+Create Date: 2026-10-18 12:28:10.277252
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7f406d10c40'
+down_revision: Union[str, Sequence[str], None] = '51810d7eda2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE comment_fts USING fts5("
+        "content, content='comment', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER comment_fts_ai AFTER INSERT ON comment BEGIN "
+        "INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER comment_fts_ad AFTER DELETE ON comment BEGIN "
+        "INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER comment_fts_au AFTER UPDATE OF content ON comment BEGIN "
+        "INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content); END"
+    )
+    # 为已有评论建立索引
+    op.execute("INSERT INTO comment_fts(comment_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS comment_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS comment_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS comment_fts_ai")
+    op.execute("DROP TABLE IF EXISTS comment_fts")
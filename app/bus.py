@@ -0,0 +1,146 @@
+# 多 worker 之间的缓存失效总线。每个 worker 在 BUS_DIR 下绑定一个 Unix 数据报套接字（<pid>.sock），
+# 广播时逐个 sendto 其他 worker，收到后调用本地注册的处理函数。BUS_DIR 为空（单进程）时什么都不做。
+# 不保证送达：对方接收缓冲区满时丢弃并计数，此时缓存最多旧到各自的 TTL
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import socket
+import time
+from typing import Callable, Dict, List
+
+from app.responses import dumps
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 重新扫描 BUS_DIR 的间隔，worker 重启后最迟这么久就能收到广播
+PEER_REFRESH_SECONDS = 1.0
+MAX_MESSAGE_SIZE = 256 * 1024
+
+
+class InvalidationBus:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._handlers: Dict[str, Callable] = {}
+        self._sock: socket.socket | None = None
+        self._path: str | None = None
+        self._peers: List[str] = []
+        self._peers_at = 0.0
+        self._leader_fd: int | None = None
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._sock is not None
+
+    def register(self, kind: str, handler: Callable) -> None:
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        if not self.directory or self._sock is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self._path)
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    def stop(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+    # 只有一个 worker 能拿到锁，用来运行会员清理等只需要跑一份的后台任务；
+    # 持锁的 worker 退出后锁自动释放，由重启的 worker 接手
+    def try_leader(self) -> bool:
+        if not self.directory:
+            return True
+        if self._leader_fd is not None:
+            return True
+        fd = os.open(os.path.join(self.directory, "leader.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        return True
+
+    def publish(self, kind: str, *args) -> None:
+        if self._sock is None:
+            return
+        message = dumps([kind, args])
+        if len(message) > MAX_MESSAGE_SIZE:
+            self.dropped += 1
+            logger.warning("失效消息过大（%d 字节），未广播：%s", len(message), kind)
+            return
+        for peer in self._peer_paths():
+            try:
+                self._sock.sendto(message, peer)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # worker 已退出但套接字文件还在
+                self._forget(peer)
+            except OSError:
+                # 对方接收缓冲区满（EAGAIN）等，丢弃
+                self.dropped += 1
+
+    def _peer_paths(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._peers_at > PEER_REFRESH_SECONDS:
+            self._peers = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".sock") and os.path.join(self.directory, name) != self._path
+            ]
+            self._peers_at = now
+        return self._peers
+
+    def _forget(self, peer: str) -> None:
+        self._peers = [p for p in self._peers if p != peer]
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(MAX_MESSAGE_SIZE)
+            except BlockingIOError:
+                return
+            self.received += 1
+            try:
+                kind, args = json.loads(data)
+                handler = self._handlers.get(kind)
+                if handler is not None:
+                    handler(*args)
+            except Exception:
+                logger.exception("处理失效消息失败")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": int(self.enabled),
+            "peers": len(self._peers),
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+
+bus = InvalidationBus(settings.BUS_DIR)
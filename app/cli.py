@@ -0,0 +1,97 @@
+# 运维命令：python -m app.cli <command>
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.db.session import async_session_maker
+
+
+async def recount_likes(args: argparse.Namespace) -> None:
+    from app.likes.counters import recount_like_counts
+
+    async with async_session_maker() as session:
+        count = await recount_like_counts(session)
+        await session.commit()
+    print(f"已重新统计 {count} 条评论的点赞数")
+
+
+async def rebuild_search(args: argparse.Namespace) -> None:
+    from app.comments.search import rebuild_search_index
+
+    async with async_session_maker() as session:
+        count = await rebuild_search_index(session)
+        await session.commit()
+    print(f"已为 {count} 条评论重建全文索引")
+
+
+async def rebuild_article_stats(args: argparse.Namespace) -> None:
+    from app.comments.counts import rebuild_article_stats
+
+    async with async_session_maker() as session:
+        count = await rebuild_article_stats(session)
+        await session.commit()
+    print(f"已重建 {count} 篇文章的评论数")
+
+
+async def rebuild_user_stats(args: argparse.Namespace) -> None:
+    from app.users.activity import rebuild_user_stats
+
+    async with async_session_maker() as session:
+        count = await rebuild_user_stats(session)
+        await session.commit()
+    print(f"已重建 {count} 个用户的统计数")
+
+
+async def export(args: argparse.Namespace) -> None:
+    from app.exports.stream import export_chunks, export_stmt
+
+    stmt = export_stmt(args.entity, args.article_id, args.user_id, args.since, args.until)
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in export_chunks(stmt, args.format):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+async def explain_queries(args: argparse.Namespace) -> None:
+    from app.db.explain import run_checks
+
+    if not run_checks(args.database_url):
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("recount-likes", help="按 comment_like 表修复 comment.like_count").set_defaults(func=recount_likes)
+
+    subparsers.add_parser("rebuild-search", help="按 comment 表重建评论全文索引 comment_fts").set_defaults(func=rebuild_search)
+
+    subparsers.add_parser("rebuild-article-stats", help="按 comment 表重建 article_stats 评论数").set_defaults(func=rebuild_article_stats)
+
+    subparsers.add_parser("rebuild-user-stats", help="按 comment / comment_like 表重建 user_stats 统计数").set_defaults(func=rebuild_user_stats)
+
+    export_parser = subparsers.add_parser("export", help="流式导出用户 / 评论 / 点赞")
+    export_parser.add_argument("entity", choices=["users", "comments", "likes"])
+    export_parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export_parser.add_argument("--output", help="输出文件，默认写到标准输出")
+    export_parser.add_argument("--article-id", help="按文章过滤（评论、点赞）")
+    export_parser.add_argument("--user-id", type=int, help="按用户过滤（评论、点赞）")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="起始时间（含），ISO 格式")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="截止时间（不含），ISO 格式")
+    export_parser.set_defaults(func=export)
+
+    explain_parser = subparsers.add_parser("explain-queries", help="用 EXPLAIN QUERY PLAN 检查路由查询是否走索引")
+    explain_parser.add_argument("--database-url", help="同步 SQLAlchemy URL，例如 sqlite:///./test.db；默认在内存库中按模型建表")
+    explain_parser.set_defaults(func=explain_queries)
+
+    args = parser.parse_args()
+    asyncio.run(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
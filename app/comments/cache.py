@@ -0,0 +1,126 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Hashable
+
+from app.cache import TTLCache
+from config import settings
+
+# 版本号只在进程内有效，重启后换一个 BOOT_ID，之前发出的 ETag 全部失效
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# 每篇文章最多缓存的分页数量（不同游标 / 页大小组合）
+MAX_PAGES_PER_ARTICLE = 8
+
+
+# 缓存的一页评论，body 是序列化后的 JSON，按需生成，节点被修改时清空。
+# 每页有自己的过期时间：文章条目在存入新页时会刷新 TTL，不能靠它让旧页过期。
+# stats 是构建前读到的 article_stats 快照，读取时与库里的当前值不同就当作未命中：
+# 其他 worker 的写入（或丢失的失效消息）不会让旧页面顶着新的 ETag 发出去
+class CachedPage:
+    __slots__ = ("page", "body", "expires_at", "stats")
+
+    def __init__(self, page: dict, body: bytes | None = None, expires_at: float = 0.0, stats: tuple | None = None):
+        self.page = page
+        self.body = body
+        self.expires_at = expires_at
+        self.stats = stats
+
+
+# 按 article_id 缓存匿名视角的评论页（liked 全为 False），登录用户的点赞状态在读取时叠加
+class CommentTreeCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        # 每篇文章最近一次变更的序号，用来丢弃在变更前开始构建的页面
+        self._seq = 0
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._max_versions = max(maxsize * 10, 10000)
+        self._floor = 0
+        # 命中统计以“页”为单位，TTLCache 自身的统计以“文章”为单位
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.patches = 0
+
+    def version(self, article_id: str) -> int:
+        return self._versions.get(article_id, self._floor)
+
+    # 读取前调用，拿到的 token 交给 store，保证不会把变更前读到的数据写进缓存
+    def begin(self) -> int:
+        return self._seq
+
+    def _touch(self, article_id: str) -> None:
+        self._seq += 1
+        self._versions[article_id] = self._seq
+        self._versions.move_to_end(article_id)
+        while len(self._versions) > self._max_versions:
+            _, evicted = self._versions.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+    def get(self, article_id: str, key: Hashable, stats: tuple | None = None) -> CachedPage | None:
+        pages = self._cache.get(article_id)
+        page = pages.get(key) if pages is not None else None
+        if page is not None and (page.expires_at < time.monotonic() or page.stats != stats):
+            del pages[key]
+            page = None
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    # 无论是否真正写入缓存都返回包装后的页面，调用方统一处理
+    def store(self, article_id: str, key: Hashable, page: dict, token: int, stats: tuple | None = None) -> CachedPage:
+        cached = CachedPage(page, expires_at=time.monotonic() + self._cache.ttl, stats=stats)
+        if not self._cache.enabled or self.version(article_id) > token:
+            return cached
+        pages = self._cache.peek(article_id)
+        if pages is None:
+            pages = {}
+        pages[key] = cached
+        while len(pages) > MAX_PAGES_PER_ARTICLE:
+            pages.pop(next(iter(pages)))
+        self._cache.set(article_id, pages)
+        return cached
+
+    def invalidate(self, article_id: str) -> None:
+        self._touch(article_id)
+        if self._cache.pop(article_id) is not None:
+            self.invalidations += 1
+
+    # 点赞数变化时直接改写缓存中的节点，不必整篇失效
+    def patch_like_count(self, article_id: str, comment_id: int, like_count: int) -> None:
+        self._touch(article_id)
+        pages = self._cache.peek(article_id)
+        if pages is None:
+            return
+        for cached in pages.values():
+            for node in iter_nodes(cached.page["items"]):
+                if node["id"] == comment_id:
+                    node["like_count"] = like_count
+                    cached.body = None
+                    self.patches += 1
+                    break
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "patches": self.patches,
+        }
+
+
+def iter_nodes(items: list[dict]):
+    stack = list(items)
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node["replies"])
+
+
+comment_tree_cache = CommentTreeCache(settings.COMMENT_CACHE_SIZE, settings.COMMENT_CACHE_TTL)
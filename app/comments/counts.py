@@ -0,0 +1,28 @@
+# 文章评论数：读 article_stats（触发器维护），一次主键查询返回多篇文章
+from typing import List
+
+from sqlalchemy import Select, delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import ArticleStats, Comment
+
+MAX_ARTICLES = 100
+
+
+def article_counts_stmt(article_ids: List[str]) -> Select:
+    return select(ArticleStats).where(ArticleStats.article_id.in_(article_ids))
+
+
+# 按 comment 表全量重建，用于导入旧数据或计数出现偏差后修复
+async def rebuild_article_stats(session: AsyncSession) -> int:
+    await session.execute(delete(ArticleStats))
+    result = await session.execute(
+        insert(ArticleStats).from_select(
+            ["article_id", "comment_count", "last_comment_at"],
+            select(Comment.article_id, func.count(), func.max(Comment.created_at))
+            .where(Comment.deleted_at.is_(None))
+            .group_by(Comment.article_id),
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,99 @@
+# 评论删除：硬删除依赖数据库 ON DELETE CASCADE 一条语句删掉整棵回复树；
+# 软删除只给整棵子树打上墓碑，再由后台任务（app/users/tasks.py 的 purge_loop）分批清理
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Select, delete, desc, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Comment
+from app.db.pagination import MAX_BULK_IDS
+
+TOMBSTONE_CONTENT = "评论已删除"
+
+
+# 评论本身或作者被软删除都展示为墓碑
+def is_tombstone(comment: Comment) -> bool:
+    return comment.deleted_at is not None or (comment.user is not None and comment.user.deleted_at is not None)
+
+
+# 某条评论及其所有后代的 id（递归 CTE，每层走 ix_comment_parent_id_id）
+def subtree_ids(comment_id: int) -> Select:
+    return subtree_of(select(Comment.id).where(Comment.id == comment_id))
+
+
+# 一组评论（seed 选出的 id）及其所有后代的 id。用 UNION 去重，seed 里同时有父评论和回复时不会重复展开
+def subtree_of(seed: Select) -> Select:
+    subtree = seed.cte("subtree", recursive=True)
+    subtree = subtree.union(select(Comment.id).where(Comment.parent_id == subtree.c.id))
+    return select(subtree.c.id)
+
+
+# 返回被删评论所在的文章，评论不存在时返回 None
+async def delete_comment(session: AsyncSession, comment_id: int) -> str | None:
+    result = await session.execute(
+        delete(Comment)
+        .where(Comment.id == comment_id)
+        .returning(Comment.article_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar()
+
+
+async def tombstone_comment(session: AsyncSession, comment_id: int) -> str | None:
+    article_id = await session.scalar(select(Comment.article_id).where(Comment.id == comment_id))
+    if article_id is None:
+        return None
+    await session.execute(
+        update(Comment)
+        .where(Comment.id.in_(subtree_ids(comment_id)), Comment.deleted_at.is_(None))
+        .values(deleted_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    return article_id
+
+
+# 清理一批墓碑。回复的 id 总比父评论大，按 id 倒序先删叶子，每条语句级联的行数都很少
+async def purge_comments(session: AsyncSession, batch_size: int) -> list[str]:
+    batch = (
+        select(Comment.id)
+        .where(Comment.deleted_at.is_not(None))
+        .order_by(desc(Comment.id))
+        .limit(batch_size)
+    )
+    result = await session.execute(
+        delete(Comment)
+        .where(Comment.id.in_(batch.scalar_subquery()))
+        .returning(Comment.article_id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(set(result.scalars().all()))
+
+
+# 批量删除（管理后台）：先查出命中的评论（dry_run 只做这一步），再用一条 DELETE（软删除时一条 UPDATE 打墓碑）完成。
+# 一次最多处理 MAX_BULK_IDS 条（按 id 从小到大），语句限定 id 不超过这一批的最大 id，
+# 超出的部分和期间新发的评论都不会被删。返回 (命中的 (id, article_id, 是否已是墓碑), 是否还有剩余)
+async def bulk_delete_comments(
+    session: AsyncSession, conditions: list[ColumnElement], soft: bool, dry_run: bool,
+) -> tuple[list[tuple], bool]:
+    found = (await session.execute(
+        select(Comment.id, Comment.article_id, Comment.deleted_at.is_not(None))
+        .where(*conditions)
+        .order_by(Comment.id)
+        .limit(MAX_BULK_IDS + 1)
+    )).all()
+    has_more = len(found) > MAX_BULK_IDS
+    found = found[:MAX_BULK_IDS]
+    if dry_run or not found:
+        return found, has_more
+    conditions = [*conditions, Comment.id <= found[-1][0]]
+    if soft:
+        await session.execute(
+            update(Comment)
+            .where(Comment.id.in_(subtree_of(select(Comment.id).where(*conditions))), Comment.deleted_at.is_(None))
+            .values(deleted_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        await session.execute(delete(Comment).where(*conditions).execution_options(synchronize_session=False))
+    return found, has_more
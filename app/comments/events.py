@@ -0,0 +1,89 @@
+# 评论 / 点赞写入提交后的通知入口，集中处理缓存失效、实时推送等副作用。
+# 每个事件先在本进程处理，再经失效总线广播，其他 worker 收到后执行同样的本地处理
+from app.bus import bus
+from app.comments.cache import comment_tree_cache
+from app.comments.live import live_hub
+from app.db.models import Comment
+
+
+def _on_comment_created(article_id: str, node: dict) -> None:
+    comment_tree_cache.invalidate(article_id)
+    live_hub.publish(article_id, "comment_created", node)
+
+
+def _on_comment_deleted(article_id: str, comment_id: int | None) -> None:
+    comment_tree_cache.invalidate(article_id)
+    if comment_id is None:
+        live_hub.publish(article_id, "resync", {})
+    else:
+        live_hub.publish(article_id, "comment_deleted", {"id": comment_id})
+
+
+def _on_comments_purged(article_id: str) -> None:
+    comment_tree_cache.invalidate(article_id)
+
+
+def _on_user_renamed(article_ids: list[str]) -> None:
+    for article_id in article_ids:
+        comment_tree_cache.invalidate(article_id)
+
+
+def _on_like_changed(article_id: str, comment_id: int, like_count: int) -> None:
+    comment_tree_cache.patch_like_count(article_id, comment_id, like_count)
+    live_hub.publish(article_id, "like_changed", {"id": comment_id, "like_count": like_count})
+
+
+_HANDLERS = {
+    "comments.created": _on_comment_created,
+    "comments.deleted": _on_comment_deleted,
+    "comments.purged": _on_comments_purged,
+    "comments.like_changed": _on_like_changed,
+    "comments.user_renamed": _on_user_renamed,
+}
+
+for _kind, _handler in _HANDLERS.items():
+    bus.register(_kind, _handler)
+
+
+def _emit(kind: str, *args) -> None:
+    _HANDLERS[kind](*args)
+    bus.publish(kind, *args)
+
+
+def comment_created(comment: Comment, username: str | None) -> None:
+    # 与评论页中的节点结构一致，前端可以直接插入
+    _emit("comments.created", comment.article_id, {
+        "id": comment.id,
+        "content": comment.content,
+        "article_id": comment.article_id,
+        "user_id": comment.user_id,
+        "parent_id": comment.parent_id,
+        "created_at": comment.created_at,
+        "username": username,
+        "deleted": False,
+        "liked": False,
+        "like_count": 0,
+        "reply_count": 0,
+        "replies": [],
+    })
+
+
+# comment_id 为空表示批量变更（如删除用户），订阅者需要重新拉取评论页
+def comment_deleted(article_id: str, comment_id: int | None = None) -> None:
+    _emit("comments.deleted", article_id, comment_id)
+
+
+# 后台清理已经推送过的墓碑，只需让缓存失效
+def comments_purged(article_id: str) -> None:
+    _emit("comments.purged", article_id)
+
+
+def like_changed(article_id: str, comment_id: int, like_count: int) -> None:
+    _emit("comments.like_changed", article_id, comment_id, like_count)
+
+
+# 缓存的评论页里带着用户名，改名后该用户评论过的文章都要失效。分批广播，单条消息不超过总线的大小限制
+def user_renamed(article_ids: list[str]) -> None:
+    article_ids = list(article_ids)
+    for start in range(0, len(article_ids), 1000):
+        _emit("comments.user_renamed", article_ids[start:start + 1000])
@@ -0,0 +1,83 @@
+# 按文章订阅的实时推送（SSE）。事件由 app/comments/events.py 发布，每个事件只序列化一次，
+# 放进各订阅者的有界队列；队列满说明客户端读得太慢，直接断开它，让它重连后重新拉取评论页
+import asyncio
+from typing import AsyncIterator, Dict, Set
+
+from app.responses import dumps
+from config import settings
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class LiveHub:
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self._queue_size = queue_size
+        self._max_subscribers = max_subscribers
+        self._channels: Dict[str, Set[Subscriber]] = {}
+        self._count = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, article_id: str) -> Subscriber | None:
+        if self._count >= self._max_subscribers:
+            return None
+        subscriber = Subscriber(self._queue_size)
+        self._channels.setdefault(article_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, article_id: str, subscriber: Subscriber) -> None:
+        channel = self._channels.get(article_id)
+        if channel is None or subscriber not in channel:
+            return
+        channel.discard(subscriber)
+        self._count -= 1
+        if not channel:
+            del self._channels[article_id]
+
+    # 只在事件循环线程里调用（写接口提交后），put_nowait 不会阻塞发布方
+    def publish(self, article_id: str, event: str, data: dict) -> None:
+        channel = self._channels.get(article_id)
+        if not channel:
+            return
+        message = b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+        self.published += 1
+        for subscriber in list(channel):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                self.dropped += 1
+                self.unsubscribe(article_id, subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "subscribers": self._count,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+# SSE 响应体：先告诉客户端重连间隔，之后转发事件，空闲时发注释行保活
+async def event_stream(hub: LiveHub, article_id: str, subscriber: Subscriber, heartbeat: float) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while not subscriber.dropped:
+            try:
+                yield await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+        # 被判定为慢消费者：通知客户端重新拉取评论页后再订阅
+        yield b"event: resync\ndata: {}\n\n"
+    finally:
+        hub.unsubscribe(article_id, subscriber)
+
+
+live_hub = LiveHub(settings.LIVE_QUEUE_SIZE, settings.LIVE_MAX_SUBSCRIBERS)
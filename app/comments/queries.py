@@ -0,0 +1,96 @@
+# 评论相关的查询语句，路由与 EXPLAIN QUERY PLAN 检查（app/db/explain.py）共用
+from typing import List, Tuple
+
+from sqlalchemy import Select, desc, func, tuple_, union_all
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+
+from app.db.models import Comment, Like
+
+
+# 一级评论的排序：new 按 id 倒序；hot / top 先按热度分 / 点赞数倒序，再按 id 倒序，
+# 都由 (article_id, parent_id, 排序键, id) 上的索引直接给出顺序
+SORT_KEYS = {"hot": Comment.hot_score, "top": Comment.like_count}
+
+
+# 某篇文章的一级评论，keyset 分页。after 是上一页最后一条的 id（new）或 (排序键, id)（hot / top）
+def root_comments_stmt(article_id: str, after: int | Tuple | None, limit: int, sort: str = "new") -> Select:
+    stmt = (
+        select(Comment)
+        .options(joinedload(Comment.user))
+        .where(Comment.article_id == article_id, Comment.parent_id.is_(None))
+        .limit(limit)
+    )
+    if sort == "new":
+        stmt = stmt.order_by(desc(Comment.id))
+        if after is not None:
+            stmt = stmt.where(Comment.id < after)
+        return stmt
+
+    key = SORT_KEYS[sort]
+    stmt = stmt.order_by(desc(key), desc(Comment.id))
+    if after is not None:
+        stmt = stmt.where(tuple_(key, Comment.id) < tuple_(*after))
+    return stmt
+
+
+# 游标：new 为 "id"，hot 为 "热度分:id"，top 为 "点赞数:id"
+def encode_cursor(comment: Comment, sort: str = "new") -> str:
+    if sort == "new":
+        return str(comment.id)
+    return f"{getattr(comment, SORT_KEYS[sort].key)!r}:{comment.id}"
+
+
+# 格式不对时抛 ValueError
+def decode_cursor(cursor: str, sort: str = "new") -> int | Tuple:
+    if sort == "new":
+        return int(cursor)
+    score, comment_id = cursor.split(":")
+    return (float(score) if sort == "hot" else int(score)), int(comment_id)
+
+
+# 某条评论的直接回复，按 id 倒序 keyset 分页
+def child_comments_stmt(parent_id: int, before_id: int | None, limit: int) -> Select:
+    stmt = (
+        select(Comment)
+        .options(joinedload(Comment.user))
+        .where(Comment.parent_id == parent_id)
+        .order_by(desc(Comment.id))
+        .limit(limit)
+    )
+    if before_id is not None:
+        stmt = stmt.where(Comment.id < before_id)
+    return stmt
+
+
+# 每条评论只取最新的 reply_limit 条直接回复，每个子查询都走 parent_id 的索引，开销与页大小成正比
+def inline_replies_stmt(parent_ids: List[int], reply_limit: int) -> Select:
+    parts = [
+        select(Comment.id)
+        .where(Comment.parent_id == parent_id)
+        .order_by(desc(Comment.id))
+        .limit(reply_limit)
+        .subquery()
+        for parent_id in parent_ids
+    ]
+    reply_ids = union_all(*[select(part.c.id) for part in parts])
+    return (
+        select(Comment)
+        .options(joinedload(Comment.user))
+        .where(Comment.id.in_(reply_ids))
+        .order_by(desc(Comment.id))
+    )
+
+
+# 每条评论的直接回复数
+def reply_counts_stmt(comment_ids: List[int]) -> Select:
+    return (
+        select(Comment.parent_id, func.count().label("count"))
+        .where(Comment.parent_id.in_(comment_ids))
+        .group_by(Comment.parent_id)
+    )
+
+
+# 用户在给定评论中点过赞的评论 id
+def liked_ids_stmt(user_id: int, comment_ids: List[int]) -> Select:
+    return select(Like.comment_id).where(Like.user_id == user_id, Like.comment_id.in_(comment_ids))
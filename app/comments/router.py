@@ -1,26 +1,52 @@
 # comments/api.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from sqlalchemy.future import select
-from sqlalchemy import desc, func
-from typing import List
-from collections import defaultdict
+from sqlalchemy import desc, false
+from typing import List, Literal
 
 from app.db.session import get_async_session
 from app.users.manager import current_active_user, current_active_user_optional, current_super_user
-from app.db.models import Comment, User, Like
-from .schemas import CommentCreate, CommentRead
+from app.db.models import ArticleStats, Comment, User
+from app.comments import events
+from app.comments.cache import BOOT_ID, comment_tree_cache
+from app.users.cache import user_cache
+from app.comments import queries
+from app.comments.queries import root_comments_stmt, child_comments_stmt
+from app.comments.tree import load_comment_page, apply_liked, render_page
+from app.responses import FastJSONResponse, ReleasingStreamingResponse, etag_matches, not_modified
+from app.db.pagination import cached_count, to_db_time
+from app.comments import search
+from app.comments import deletion
+from app.comments.deletion import is_tombstone
+from app.comments.live import live_hub, event_stream
+from app.ratelimit import limit_comments
+from config import settings
+from app.comments.counts import MAX_ARTICLES, article_counts_stmt
+from .schemas import (
+    CommentCreate, CommentRead, CommentPage, CommentAdminPage, CommentSearchPage, ArticleCommentCount, ArticleCommentCounts,
+    CommentBulkDelete, CommentBulkResult,
+)
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
-@router.post("", response_model=CommentRead)
+@router.post("", response_model=CommentRead, dependencies=[Depends(limit_comments)])
 async def create_comment(
     comment: CommentCreate,
     user=Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
+    # 父评论必须存在且未被软删除，不允许回复墓碑
+    if comment.parent_id is not None:
+        parent = (await session.execute(select(Comment.deleted_at).where(Comment.id == comment.parent_id))).first()
+        if parent is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="父评论不存在")
+        if parent.deleted_at is not None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="父评论已删除，不能回复")
     new_comment = Comment(
         content=comment.content, 
         user_id=user.id,
@@ -31,92 +57,253 @@ async def create_comment(
     session.add(new_comment)
     await session.commit()
     await session.refresh(new_comment)
+    events.comment_created(new_comment, user.username)
     return new_comment
 
 
-@router.get("/by_article/{article_id}", response_model=List[CommentRead])
+# 分页参数：一级评论按 id 倒序做 keyset 分页，每条一级评论只内联少量回复
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+DEFAULT_INLINE_REPLIES = 3
+MAX_INLINE_REPLIES = 20
+
+
+def decode_cursor(cursor: str | None, sort: str = "new") -> int | tuple | None:
+    if cursor is None:
+        return None
+    try:
+        return queries.decode_cursor(cursor, sort)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+# 文章版本覆盖评论与点赞的变更，用户缓存的代数覆盖用户名、注销等资料变化；
+# 登录用户的 liked 状态因人而异，ETag 里带上用户 id。
+# 进程内的版本号只反映经过本进程（或失效总线）的写入，再带上 article_stats 的评论数和最后评论时间，
+# 其他进程或直接改库造成的变化也会让 ETag 失效
+def thread_etag(article_id: str, cache_key: tuple, current_user: User | None, stats: tuple | None) -> str:
+    raw = "|".join(map(str, (
+        BOOT_ID,
+        article_id,
+        comment_tree_cache.version(article_id),
+        stats,
+        user_cache.begin(),
+        cache_key,
+        current_user.id if current_user else "",
+    )))
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+@router.get("/by_article/{article_id}", response_model=CommentPage)
 async def list_comments_by_article(
+    request: Request,
     article_id: str,
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页一级评论数量"),
+    reply_limit: int = Query(DEFAULT_INLINE_REPLIES, ge=0, le=MAX_INLINE_REPLIES, description="每条评论内联的回复数量"),
+    sort: Literal["new", "hot", "top"] = Query("new", description="new 最新 / hot 热度（点赞数随时间衰减）/ top 点赞最多"),
     session: AsyncSession = Depends(get_async_session),
     current_user: User | None = Depends(current_active_user_optional),  # 获取当前登录用户
 ):
-    stmt = select(Comment).options(joinedload(Comment.user)).where(Comment.article_id == article_id).order_by(desc(Comment.id))
-    result = await session.execute(stmt)
-    comments = result.scalars().all()
+    after = decode_cursor(cursor, sort)
+    # hot / top 页面缓存后点赞数会被就地更新，但顺序要等缓存过期（COMMENT_CACHE_TTL）或有新评论才会重排
+    cache_key = (after, limit, reply_limit, sort)
 
-    comment_ids = [c.id for c in comments]
+    # 条件请求：文章版本和 article_stats 都没变就直接 304，只做一次主键查询。
+    # ETag 在查询前算出，查询期间的变更只会让下次多验证一次
+    stats = (await session.execute(
+        select(ArticleStats.comment_count, ArticleStats.last_comment_at).where(ArticleStats.article_id == article_id)
+    )).first()
+    stats = tuple(stats) if stats else None
+    etag = thread_etag(article_id, cache_key, current_user, stats)
+    # 同一 ETag 对应压缩前的内容，缓存要按 Accept-Encoding 区分 gzip 与未压缩的响应
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if current_user else "no-cache",
+        "Vary": "Authorization, Cookie, Accept-Encoding",
+    }
+    if etag_matches(request, etag):
+        return not_modified(headers)
 
-    # 查询每条评论的点赞数
-    stmt_like_counts = (
-        select(Like.comment_id, func.count().label("count"))
-        .where(Like.comment_id.in_(comment_ids))
-        .group_by(Like.comment_id)
+    # 匿名视角的评论页对所有人相同，先查缓存，登录用户再叠加自己的点赞状态。
+    # 缓存页记着构建时的 article_stats，和这次算 ETag 用的不一致就重新查，保证 ETag 和内容对应
+    cached = comment_tree_cache.get(article_id, cache_key, stats)
+    if cached is None:
+        token = comment_tree_cache.begin()
+        comments = (await session.execute(root_comments_stmt(article_id, after, limit + 1, sort))).scalars().all()
+        page = await load_comment_page(session, comments, limit, reply_limit, sort)
+        cached = comment_tree_cache.store(article_id, cache_key, page, token, stats)
+    response = await render_page(session, cached, current_user)
+    response.headers.update(headers)
+    return response
+
+
+# 订阅某篇文章的实时变更（SSE）：comment_created / comment_deleted / like_changed / resync。
+# 前端先拉一次评论页，之后只应用推送的增量，不再轮询
+@router.get("/by_article/{article_id}/events")
+async def subscribe_article(article_id: str):
+    subscriber = live_hub.subscribe(article_id)
+    if subscriber is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="订阅人数已满，请稍后重试")
+    # 客户端在第一条事件之前断开时 event_stream 的 finally 不会执行，由响应结束时退订
+    return ReleasingStreamingResponse(
+        event_stream(live_hub, article_id, subscriber, settings.LIVE_HEARTBEAT),
+        partial(live_hub.unsubscribe, article_id, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 批量查询文章的评论数与最后评论时间，供文章列表页使用
+@router.get("/counts", response_model=ArticleCommentCounts)
+async def comment_counts(
+    article_ids: List[str] = Query(..., description="文章 id，可重复传参，如 ?article_ids=a&article_ids=b"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    if len(article_ids) > MAX_ARTICLES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"一次最多查询 {MAX_ARTICLES} 篇文章")
+    rows = {row.article_id: row for row in (await session.execute(article_counts_stmt(article_ids))).scalars()}
+    return ArticleCommentCounts(
+        items=[
+            ArticleCommentCount(
+                article_id=article_id,
+                comment_count=rows[article_id].comment_count if article_id in rows else 0,
+                last_comment_at=rows[article_id].last_comment_at if article_id in rows else None,
+            )
+            for article_id in article_ids
+        ]
     )
-    result_counts = await session.execute(stmt_like_counts)
-    like_counts = {row[0]: row[1] for row in result_counts.all()}
-
-
-    liked_comment_ids = set()
-    if current_user:
-        # 查询当前用户点赞的评论id集合
-        stmt_likes = select(Like.comment_id).where(Like.user_id == current_user.id, Like.comment_id.in_([c.id for c in comments]))
-        result_likes = await session.execute(stmt_likes)
-        liked_comment_ids = set(row[0] for row in result_likes.all())
-
-    # 根据 parent_id 分类
-    comment_map = defaultdict(list)
-    for comment in comments:
-        comment_map[comment.parent_id].append(comment)
-
-    # 构造树状结构
-    def build_comment_tree(comment: Comment) -> CommentRead:
-        return CommentRead(
-            id=comment.id,
-            content=comment.content,
-            article_id=comment.article_id,
-            user_id=comment.user_id,
-            parent_id=comment.parent_id,
-            created_at=comment.created_at,
-            username=comment.user.username if comment.user else None,
-            liked=(comment.id in liked_comment_ids if current_user else False),
-            like_count=like_counts.get(comment.id, 0),
-            replies=[build_comment_tree(child) for child in comment_map.get(comment.id, [])]
-        )
 
-    # 只返回一级评论（parent_id is None）
-    root_comments = comment_map[None]
-    return [build_comment_tree(c) for c in root_comments]
+
+# 懒加载某条评论下的回复，同样按 id 倒序做 keyset 分页
+@router.get("/{comment_id}/replies", response_model=CommentPage)
+async def list_replies(
+    comment_id: int,
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页回复数量"),
+    reply_limit: int = Query(0, ge=0, le=MAX_INLINE_REPLIES, description="每条回复内联的下一级回复数量"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User | None = Depends(current_active_user_optional),
+):
+    before_id = decode_cursor(cursor)
+    comments = (await session.execute(child_comments_stmt(comment_id, before_id, limit + 1))).scalars().all()
+    page = await load_comment_page(session, comments, limit, reply_limit)
+    return FastJSONResponse(await apply_liked(session, page, current_user))
 
 # 管理员专用
 
-@router.get("/all", response_model=List[CommentRead])
+@router.get("/all", response_model=CommentAdminPage)
 async def list_comments(
-    page: int = 1,
-    page_size: int = 20,
+    cursor: int | None = Query(None, description="上一页返回的 next_cursor"),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每页数量"),
+    article_id: str | None = Query(None, description="按文章过滤"),
+    user_id: int | None = Query(None, description="按用户过滤"),
+    since: datetime | None = Query(None, description="起始时间（含）"),
+    until: datetime | None = Query(None, description="截止时间（不含）"),
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_super_user)
     ):
+    conditions = []
+    if article_id is not None:
+        conditions.append(Comment.article_id == article_id)
+    if user_id is not None:
+        conditions.append(Comment.user_id == user_id)
+    # id 随 created_at 单调递增，时间范围先换算成 id 范围，分页仍然走 id 上的索引
+    if since is not None:
+        low = await session.scalar(
+            select(Comment.id).where(Comment.created_at >= to_db_time(since)).order_by(Comment.created_at).limit(1)
+        )
+        conditions.append(Comment.id >= low if low is not None else false())
+    if until is not None:
+        high = await session.scalar(
+            select(Comment.id).where(Comment.created_at < to_db_time(until)).order_by(desc(Comment.created_at)).limit(1)
+        )
+        conditions.append(Comment.id <= high if high is not None else false())
+
     stmt = (
         select(Comment)
         .options(joinedload(Comment.user))
+        .where(*conditions)
         .order_by(desc(Comment.id))
-        .offset((page - 1) * page_size)
-        .limit(page_size)
+        .limit(page_size + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(Comment.id < cursor)
+    comments = (await session.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(comments) > page_size:
+        comments = comments[:page_size]
+        next_cursor = comments[-1].id
+
+    total = await cached_count(session, ("comment", article_id, user_id, since, until), Comment, conditions)
+    return CommentAdminPage(
+        items=[
+            CommentRead(
+                id=c.id,
+                content=c.content,
+                user_id=c.user_id,
+                article_id=c.article_id,
+                parent_id=c.parent_id,
+                created_at=c.created_at,
+                username=c.user.username if c.user else None,
+                like_count=c.like_count,
+                deleted=is_tombstone(c),
+            )
+            for c in comments
+        ],
+        next_cursor=next_cursor,
+        total=total,
+    )
+
+# 全文检索评论，结果按相关度排序，供管理员排查违规内容
+@router.get("/search", response_model=CommentSearchPage)
+async def search_comments(
+    q: str = Query(..., min_length=1, max_length=200, description="关键词，空格分隔的多个词需同时出现"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每页数量"),
+    article_id: str | None = Query(None, description="按文章过滤"),
+    user_id: int | None = Query(None, description="按用户过滤"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_super_user),
+):
+    if not q.split():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="关键词不能为空")
+    after = None
+    if cursor is not None:
+        try:
+            after = search.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+    rows = (await session.execute(search.search_comments_stmt(q, article_id, user_id, after, page_size + 1))).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last, rank = rows[-1]
+        next_cursor = search.encode_cursor(rank, last.id)
+
+    return CommentSearchPage(
+        items=[
+            CommentRead(
+                id=c.id,
+                content=c.content,
+                user_id=c.user_id,
+                article_id=c.article_id,
+                parent_id=c.parent_id,
+                created_at=c.created_at,
+                username=c.user.username if c.user else None,
+                like_count=c.like_count,
+                deleted=is_tombstone(c),
+            )
+            for c, _ in rows
+        ],
+        next_cursor=next_cursor,
     )
-    result = await session.execute(stmt)
-    comments = result.scalars().all()
-    return [
-        CommentRead(
-            id=c.id,
-            content=c.content,
-            user_id=c.user_id,
-            article_id=c.article_id,
-            parent_id=c.parent_id,
-            created_at=c.created_at,
-            username=c.user.username if c.user else None,
-        )
-        for c in comments
-    ]
+
+@router.get("/cache-stats")
+async def comment_cache_stats(current_user: User = Depends(current_super_user)):
+    return comment_tree_cache.stats()
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
@@ -124,12 +311,51 @@ async def delete_comment(
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_super_user),
 ):
-    result = await session.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalars().first()
-    if not comment:
+    # 不加载评论对象，回复与点赞由数据库级联删除；软删除模式下只给整棵子树打墓碑
+    if settings.SOFT_DELETE_ENABLED:
+        article_id = await deletion.tombstone_comment(session, comment_id)
+    else:
+        article_id = await deletion.delete_comment(session, comment_id)
+    if article_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found"
         )
-    await session.delete(comment)
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+    events.comment_deleted(article_id, comment_id)
+
+
+# 批量删除：整批一条语句、一个事务，按文章通知订阅者重新拉取
+@router.post("/bulk-delete", response_model=CommentBulkResult)
+async def bulk_delete_comments(
+    body: CommentBulkDelete,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_super_user),
+):
+    conditions = []
+    if body.ids is not None:
+        conditions.append(Comment.id.in_(body.ids))
+    if body.user_id is not None:
+        conditions.append(Comment.user_id == body.user_id)
+    if body.article_id is not None:
+        conditions.append(Comment.article_id == body.article_id)
+    if not conditions:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="至少需要 ids、user_id、article_id 中的一个")
+
+    soft = settings.SOFT_DELETE_ENABLED
+    # 按条件删除时跳过已有的墓碑，has_more 时重复调用才能继续往后处理
+    if soft and body.ids is None:
+        conditions.append(Comment.deleted_at.is_(None))
+    found, has_more = await deletion.bulk_delete_comments(session, conditions, soft, body.dry_run)
+    items = [
+        {"id": comment_id, "article_id": article_id, "status": "unchanged" if soft and tombstoned else "deleted"}
+        for comment_id, article_id, tombstoned in found
+    ]
+    matched = {comment_id for comment_id, _, _ in found}
+    items += [{"id": comment_id, "status": "not_found"} for comment_id in dict.fromkeys(body.ids or []) if comment_id not in matched]
+
+    if not body.dry_run and found:
+        await session.commit()
+        for article_id in {article_id for _, article_id, _ in found}:
+            events.comment_deleted(article_id)
+    return CommentBulkResult(dry_run=body.dry_run, items=items, has_more=has_more)
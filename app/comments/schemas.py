@@ -1,7 +1,9 @@
 # comments/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import List, Literal
+
+from app.db.pagination import MAX_BULK_IDS
 
 class CommentCreate(BaseModel):
     content: str
@@ -17,14 +19,54 @@ class CommentRead(BaseModel):
     parent_id: int | None = None
     username: str | None = None # ⭐ 新增字段：用户名
     like_count: int = 0
+    deleted: bool = False  # 已删除、等待清理的墓碑
     liked: bool = False 
+    reply_count: int = 0  # 直接回复总数，replies 只内联其中一部分
     replies: List["CommentRead"] = []  # ⬅️ 加上这句
 
     class Config:
         from_attributes = True
 
+class CommentPage(BaseModel):
+    items: List[CommentRead]
+    next_cursor: str | None = None  # 为空表示没有下一页
+
+class CommentAdminPage(BaseModel):
+    items: List[CommentRead]
+    next_cursor: int | None = None
+    total: int  # 满足过滤条件的总数，可能有 ADMIN_COUNT_TTL 秒的延迟
+
+class CommentSearchPage(BaseModel):
+    items: List[CommentRead]  # 按相关度排序
+    next_cursor: str | None = None
+
+class ArticleCommentCount(BaseModel):
+    article_id: str
+    comment_count: int = 0
+    last_comment_at: datetime | None = None
+
+class ArticleCommentCounts(BaseModel):
+    items: List[ArticleCommentCount]  # 与请求中 article_ids 的顺序一致
+
 class CommentDelete(BaseModel):
     id: int
 
+# 批量删除：ids / user_id / article_id 至少给一个，同时给出时取交集；dry_run 时只返回命中结果，不删除
+class CommentBulkDelete(BaseModel):
+    ids: List[int] | None = Field(None, min_length=1, max_length=MAX_BULK_IDS)
+    user_id: int | None = None
+    article_id: str | None = None
+    dry_run: bool = False
+
+class CommentBulkOutcome(BaseModel):
+    id: int
+    status: Literal["deleted", "unchanged", "not_found"]  # unchanged：软删除模式下已经是墓碑
+    article_id: str | None = None
+
+class CommentBulkResult(BaseModel):
+    dry_run: bool
+    items: List[CommentBulkOutcome]  # 命中的评论按 id 顺序，之后是未找到的 ids；回复随父评论一起删除，不单独列出
+    has_more: bool = False  # 按条件删除时一次最多处理 MAX_BULK_IDS 条，为 true 时再调用一次处理剩下的
+
 # 解决 forward reference
-CommentRead.model_rebuild()
\ No newline at end of file
+CommentRead.model_rebuild()
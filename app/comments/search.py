@@ -0,0 +1,77 @@
+# 评论全文检索，基于 comment_fts（FTS5 + trigram，定义见 app/db/models.py）
+from typing import List, Tuple
+
+from sqlalchemy import Float, Integer, Select, and_, column, desc, literal, or_, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+
+from app.db.models import Comment
+
+# trigram 分词下少于 3 个字符的词无法走索引
+MIN_INDEXED_TERM = 3
+
+comment_fts = table(
+    "comment_fts",
+    column("rowid", Integer),
+    column("rank", Float),  # FTS5 内置的 bm25 得分，越小越相关
+    column("comment_fts"),  # 与表同名的隐藏列，用于 MATCH
+)
+
+
+# 每个词都作为短语加引号，避免用户输入被当成 FTS5 查询语法
+def split_terms(query: str) -> Tuple[List[str], List[str]]:
+    terms = query.split()
+    indexed = ['"' + t.replace('"', '""') + '"' for t in terms if len(t) >= MIN_INDEXED_TERM]
+    short = [t for t in terms if len(t) < MIN_INDEXED_TERM]
+    return indexed, short
+
+
+def encode_cursor(rank: float, comment_id: int) -> str:
+    return f"{rank!r}:{comment_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    rank, comment_id = cursor.split(":")
+    return float(rank), int(comment_id)
+
+
+# 按相关度升序、id 倒序排列，(rank, id) 做 keyset 分页。
+# 长词走 MATCH，1~2 个字的短词只能在 MATCH 命中的结果里用 LIKE 过滤；全是短词时退化为扫描 comment 表
+def search_comments_stmt(
+    query: str,
+    article_id: str | None,
+    user_id: int | None,
+    after: Tuple[float, int] | None,
+    limit: int,
+) -> Select:
+    indexed, short = split_terms(query)
+    if indexed:
+        rank = comment_fts.c.rank
+        stmt = (
+            select(Comment, rank)
+            .join(comment_fts, comment_fts.c.rowid == Comment.id)
+            .where(comment_fts.c.comment_fts.match(" ".join(indexed)))
+        )
+    else:
+        rank = literal(0.0)
+        stmt = select(Comment, rank)
+
+    stmt = stmt.options(joinedload(Comment.user))
+    for term in short:
+        stmt = stmt.where(Comment.content.contains(term, autoescape=True))
+    if article_id is not None:
+        stmt = stmt.where(Comment.article_id == article_id)
+    if user_id is not None:
+        stmt = stmt.where(Comment.user_id == user_id)
+    if after is not None:
+        after_rank, after_id = after
+        stmt = stmt.where(or_(rank > after_rank, and_(rank == after_rank, Comment.id < after_id)))
+    return stmt.order_by(rank, desc(Comment.id)).limit(limit)
+
+
+# 按 comment 表重建索引，用于导入旧数据或索引损坏后修复
+async def rebuild_search_index(session: AsyncSession) -> int:
+    await session.execute(text("INSERT INTO comment_fts(comment_fts) VALUES ('rebuild')"))
+    await session.execute(text("INSERT INTO comment_fts(comment_fts) VALUES ('optimize')"))
+    return (await session.execute(text("SELECT count(*) FROM comment"))).scalar_one()
@@ -0,0 +1,104 @@
+from itertools import chain
+from typing import Iterable, List
+
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Comment, User
+from app.comments.cache import CachedPage, iter_nodes
+from app.comments.deletion import TOMBSTONE_CONTENT, is_tombstone
+from app.comments.queries import encode_cursor, inline_replies_stmt, reply_counts_stmt, liked_ids_stmt
+from app.responses import FastJSONResponse, dumps, rendered_json
+
+
+def comment_node(comment: Comment, reply_count: int = 0) -> dict:
+    deleted = is_tombstone(comment)
+    return {
+        "id": comment.id,
+        "content": TOMBSTONE_CONTENT if deleted else comment.content,
+        "article_id": comment.article_id,
+        "user_id": comment.user_id,
+        "parent_id": comment.parent_id,
+        "created_at": comment.created_at,
+        "username": comment.user.username if comment.user and not deleted else None,
+        "deleted": deleted,
+        "liked": False,
+        "like_count": comment.like_count,
+        "reply_count": reply_count,
+        "replies": [],
+    }
+
+
+# 非递归地构造评论树：先建好所有节点，再按 parent_id 挂到父节点下，层级再深也不会爆栈
+def build_nodes(comments: Iterable[Comment], replies: Iterable[Comment], reply_counts: dict[int, int]) -> List[dict]:
+    comments, replies = list(comments), list(replies)
+    nodes = {}
+    for comment in chain(comments, replies):
+        nodes[comment.id] = comment_node(comment, reply_counts.get(comment.id, 0))
+    for reply in replies:
+        parent = nodes.get(reply.parent_id)
+        if parent is not None:
+            parent["replies"].append(nodes[reply.id])
+    return [nodes[c.id] for c in comments]
+
+
+# 构造匿名视角的评论页：{"items": [...], "next_cursor": ...}，节点为普通 dict，便于缓存与叠加 liked
+async def load_comment_page(
+    session: AsyncSession,
+    comments: List[Comment],
+    limit: int,
+    reply_limit: int,
+    sort: str = "new",
+) -> dict:
+    # comments 多取了一条，用来判断是否还有下一页
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1], sort)
+
+    parent_ids = [c.id for c in comments]
+    if not parent_ids:
+        return {"items": [], "next_cursor": None}
+
+    replies: List[Comment] = []
+    if reply_limit > 0:
+        replies = (await session.execute(inline_replies_stmt(parent_ids, reply_limit))).scalars().all()
+
+    # 查询每条评论的直接回复数，客户端据此决定是否展示“展开更多回复”
+    page_ids = parent_ids + [r.id for r in replies]
+    reply_counts = {row[0]: row[1] for row in (await session.execute(reply_counts_stmt(page_ids))).all()}
+
+    return {
+        "items": build_nodes(comments, replies, reply_counts),
+        "next_cursor": next_cursor,
+    }
+
+
+# 叠加当前用户的点赞状态：只查一次本页评论里用户点过赞的 id，不修改（可能被缓存共享的）原页面
+async def apply_liked(session: AsyncSession, page: dict, current_user: User | None) -> dict:
+    if not current_user or not page["items"]:
+        return page
+
+    page_ids = [node["id"] for node in iter_nodes(page["items"])]
+    liked_comment_ids = set((await session.execute(liked_ids_stmt(current_user.id, page_ids))).scalars().all())
+    if not liked_comment_ids:
+        return page
+
+    items = [dict(node) for node in page["items"]]
+    stack = list(items)
+    while stack:
+        node = stack.pop()
+        node["liked"] = node["id"] in liked_comment_ids
+        node["replies"] = [dict(child) for child in node["replies"]]
+        stack.extend(node["replies"])
+    return {**page, "items": items}
+
+
+# 输出评论页：当前用户没有点过本页的评论时直接复用缓存里序列化好的 JSON
+async def render_page(session: AsyncSession, cached: CachedPage, current_user: User | None) -> Response:
+    page = await apply_liked(session, cached.page, current_user)
+    if page is not cached.page:
+        return FastJSONResponse(page)
+    if cached.body is None:
+        cached.body = dumps(page)
+    return rendered_json(cached.body)
@@ -0,0 +1,157 @@
+# 用 EXPLAIN QUERY PLAN 检查路由里的查询都走索引：python -m app.cli explain-queries
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import create_engine, delete, desc, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import Executable
+
+from app.db.models import Base, Comment, Like, User
+from app.comments import queries, search
+from app.comments.counts import article_counts_stmt
+from app.comments.deletion import subtree_ids, subtree_of
+from app.db.pagination import prefix_range
+from app.likes.counters import like_state_stmt
+from app.users import activity
+
+
+@dataclass
+class PlannedQuery:
+    name: str
+    build: Callable[[], Executable]
+    # 按主键顺序扫描并 LIMIT 的分页查询允许出现 SCAN，成本只与页大小有关
+    allow_pk_scan: bool = False
+    # 前缀等范围过滤后对命中的行排序，成本与命中行数有关
+    allow_sort: bool = False
+
+
+def router_queries() -> List[PlannedQuery]:
+    return [
+        PlannedQuery("comments.by_article", lambda: queries.root_comments_stmt("article", 100, 21)),
+        PlannedQuery("comments.by_article?sort=hot", lambda: queries.root_comments_stmt("article", (1234.5, 100), 21, "hot")),
+        PlannedQuery("comments.by_article?sort=top", lambda: queries.root_comments_stmt("article", (10, 100), 21, "top")),
+        PlannedQuery("comments.replies", lambda: queries.child_comments_stmt(1, 100, 21)),
+        PlannedQuery("comments.inline_replies", lambda: queries.inline_replies_stmt([1, 2, 3], 3)),
+        PlannedQuery("comments.reply_counts", lambda: queries.reply_counts_stmt([1, 2, 3])),
+        PlannedQuery("comments.liked_ids", lambda: queries.liked_ids_stmt(1, [1, 2, 3])),
+        PlannedQuery("comments.counts", lambda: article_counts_stmt(["a", "b", "c"])),
+        PlannedQuery(
+            "likes.unlike",
+            lambda: delete(Like).where(
+                Like.comment_id.in_(select(Comment.id).where(Comment.id == 1, Comment.deleted_at.is_(None))), Like.user_id == 1,
+            ),
+        ),
+        PlannedQuery("likes.state", lambda: like_state_stmt(1, [1, 2, 3])),
+        PlannedQuery(
+            "likes.adjust_like_count",
+            lambda: update(Comment).where(Comment.id == 1).values(like_count=Comment.like_count + 1),
+        ),
+        PlannedQuery(
+            "comments.all",
+            lambda: select(Comment).options(joinedload(Comment.user)).order_by(desc(Comment.id)).limit(20),
+            allow_pk_scan=True,
+        ),
+        PlannedQuery(
+            "comments.all?article_id",
+            lambda: admin_comments_stmt(Comment.article_id == "article", Comment.id < 100),
+        ),
+        PlannedQuery(
+            "comments.all?user_id",
+            lambda: admin_comments_stmt(Comment.user_id == 1, Comment.id < 100),
+        ),
+        PlannedQuery(
+            "comments.all?since",
+            lambda: select(Comment.id).where(Comment.created_at >= datetime(2025, 1, 1)).order_by(Comment.created_at).limit(1),
+        ),
+        # 全文检索：MATCH 走 FTS5 索引，命中结果再按相关度排序
+        PlannedQuery(
+            "comments.search",
+            lambda: search.search_comments_stmt("垃圾广告 加微信", "article", None, (-1.5, 100), 21),
+            allow_sort=True,
+        ),
+        # 软删除与后台清理
+        PlannedQuery("comments.tombstone_subtree", lambda: subtree_ids(1)),
+        PlannedQuery(
+            "comments.bulk_delete?user_id&article_id",
+            lambda: select(Comment.id).where(Comment.user_id == 1, Comment.article_id == "article").order_by(Comment.id),
+        ),
+        PlannedQuery(
+            "comments.bulk_tombstone_subtree",
+            lambda: subtree_of(select(Comment.id).where(Comment.user_id == 1, Comment.article_id == "article")),
+        ),
+        PlannedQuery(
+            "purge.comments",
+            lambda: select(Comment.id).where(Comment.deleted_at.is_not(None)).order_by(desc(Comment.id)).limit(500),
+        ),
+        PlannedQuery(
+            "purge.user_comments",
+            lambda: select(Comment.id).where(Comment.user_id == 1).order_by(desc(Comment.id)).limit(500),
+        ),
+        PlannedQuery(
+            "purge.user_likes",
+            lambda: select(Like.comment_id).where(Like.user_id == 1).order_by(Like.comment_id).limit(500),
+        ),
+        # 用户动态：两类各按 (user_id, created_at) 索引倒序取一页
+        PlannedQuery("users.activity_comments", lambda: activity.user_comments_stmt(1, ("2025-01-01 00:00:00.000000", "comment", 100), 21)),
+        PlannedQuery("users.activity_likes", lambda: activity.user_likes_stmt(1, ("2025-01-01 00:00:00.000000", "comment", 100), 21)),
+        PlannedQuery("purge.next_user", lambda: select(User.id).where(User.deleted_at.is_not(None)).limit(1)),
+        PlannedQuery(
+            "admin.list_users",
+            lambda: select(User).order_by(desc(User.id)).limit(20),
+            allow_pk_scan=True,
+        ),
+        PlannedQuery(
+            "admin.list_users?is_premium",
+            lambda: select(User).where(User.is_premium == True, User.id < 100).order_by(desc(User.id)).limit(21),  # noqa: E712
+        ),
+        PlannedQuery(
+            "admin.list_users?username",
+            lambda: select(User).where(*prefix_range(User.username, "abc")).order_by(desc(User.id)).limit(21),
+            allow_sort=True,
+        ),
+    ]
+
+
+def admin_comments_stmt(*conditions) -> Executable:
+    return select(Comment).options(joinedload(Comment.user)).where(*conditions).order_by(desc(Comment.id)).limit(21)
+
+
+def explain(engine: Engine, stmt: Executable) -> List[str]:
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return [row[-1] for row in rows]
+
+
+# 返回每条查询的问题列表：全表扫描、或需要临时 B 树排序 / 分组
+def check_plan(plan: List[str], allow_pk_scan: bool, allow_sort: bool = False) -> List[str]:
+    problems = []
+    for detail in plan:
+        if detail.startswith("USE TEMP B-TREE"):
+            if not allow_sort:
+                problems.append(detail)
+        elif detail.startswith("SCAN ") and " INDEX " not in detail and not allow_pk_scan:
+            # 子查询 / CTE 的结果扫描不算访问表
+            if not detail.startswith(("SCAN anon_", "SCAN (subquery", "SCAN CONSTANT ROW", "SCAN subtree")):
+                problems.append(detail)
+    return problems
+
+
+# database_url 为空时在内存库里按模型建表，只验证索引设计；传入真实库则同时验证迁移结果
+def run_checks(database_url: str | None = None) -> bool:
+    engine = create_engine(database_url or "sqlite://")
+    if database_url is None:
+        Base.metadata.create_all(engine)
+
+    ok = True
+    for query in router_queries():
+        plan = explain(engine, query.build())
+        problems = check_plan(plan, query.allow_pk_scan, query.allow_sort)
+        ok = ok and not problems
+        print(f"[{'OK' if not problems else 'FAIL'}] {query.name}")
+        for detail in plan:
+            print(f"    {detail}")
+    engine.dispose()
+    return ok
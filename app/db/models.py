@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, String, Integer, Text, DateTime, Boolean
+from sqlalchemy import ForeignKey, String, Integer, Float, Text, DateTime, Boolean, Index, Computed, DDL, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from fastapi_users.db import SQLAlchemyBaseUserTable
 
@@ -11,31 +11,74 @@ class Base(DeclarativeBase):
     pass
 
 
+# 热度分：点赞数每多 10 倍，相当于晚发 12.5 小时（45000 秒）。以固定纪元（2025-01-01）为基准，
+# 分数只随点赞数变化，不随当前时间变化，新评论天然排在前面，不需要后台定期重新衰减。
+# 作为 VIRTUAL 生成列由 SQLite 计算，点赞数更新时索引自动维护（log10 需要 SQLite 3.35+ 的数学函数）
+HOT_SCORE_SQL = "log10(max(like_count, 1)) + (julianday(created_at) - 2460676.5) * 86400 / 45000"
+
+
 class Comment(Base):
     __tablename__ = "comment"
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    article_id: Mapped[str] = mapped_column(String, index=True, server_default="")
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    article_id: Mapped[str] = mapped_column(String, server_default="")
     content: Mapped[str] = mapped_column(Text, nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
     parent_id: Mapped[int] = mapped_column(Integer, ForeignKey('comment.id', ondelete="CASCADE"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # 冗余的点赞计数，由点赞接口在同一事务内维护，可用 recount-likes 命令修复
+    like_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # 软删除墓碑：非空表示已删除、等待后台任务清理，展示为“评论已删除”
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    hot_score: Mapped[float] = mapped_column(Float, Computed(HOT_SCORE_SQL, persisted=False), nullable=True)
 
     # 关系字段
     user: Mapped["User"] = relationship("User", back_populates="comments")
-    likes: Mapped[list["Like"]] = relationship("Like", back_populates="comment", cascade="all, delete-orphan")
+    # 子评论与点赞由数据库的 ON DELETE CASCADE 删除，ORM 不再逐行加载删除
+    likes: Mapped[list["Like"]] = relationship("Like", back_populates="comment", cascade="all, delete-orphan", passive_deletes=True)
     
     parent = relationship("Comment", remote_side=[id], back_populates="children")
-    children = relationship("Comment", back_populates="parent", cascade="all, delete-orphan")
+    children = relationship("Comment", back_populates="parent", cascade="all, delete-orphan", passive_deletes=True)
+
+    # 索引按实际查询设计，迁移见 alembic/versions
+    __table_args__ = (
+        # 文章的一级评论：article_id = ? AND parent_id IS NULL ORDER BY id DESC
+        Index("ix_comment_article_id_parent_id_id", "article_id", "parent_id", "id"),
+        # 文章一级评论按热度 / 点赞数排序：sort=hot / sort=top
+        Index("ix_comment_article_id_parent_id_hot", "article_id", "parent_id", "hot_score", "id"),
+        Index("ix_comment_article_id_parent_id_likes", "article_id", "parent_id", "like_count", "id"),
+        # 评论的回复与回复数：parent_id = ? / parent_id IN (...) ORDER BY id DESC
+        Index("ix_comment_parent_id_id", "parent_id", "id"),
+        # 某用户的评论：user_id = ? ORDER BY id DESC
+        Index("ix_comment_user_id_id", "user_id", "id"),
+        # 用户动态：user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_comment_user_id_created_at", "user_id", "created_at"),
+        # 管理后台按文章过滤：article_id = ? ORDER BY id DESC
+        Index("ix_comment_article_id_id", "article_id", "id"),
+        # 管理后台按时间过滤时换算 id 范围
+        Index("ix_comment_created_at", "created_at"),
+        # 待清理的墓碑，部分索引只包含已删除的行
+        Index("ix_comment_deleted_id", "id", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
 class User(SQLAlchemyBaseUserTable[int], Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     username: Mapped[str] = mapped_column(String(length=32), nullable=False, server_default="temp")
     is_premium: Mapped[bool] = mapped_column(Boolean, default=False)
     premium_end_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # 软删除墓碑：非空表示已注销，评论展示为“评论已删除”，由后台任务分批清理
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
-    # 建立双向关系：一个用户对应多个评论
-    comments: Mapped[list["Comment"]] = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
-    likes: Mapped[list["Like"]] = relationship("Like", back_populates="user", cascade="all, delete-orphan")
+    # 建立双向关系：一个用户对应多个评论（删除由数据库级联完成）
+    comments: Mapped[list["Comment"]] = relationship("Comment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    likes: Mapped[list["Like"]] = relationship("Like", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+
+    # 管理后台的用户列表过滤
+    __table_args__ = (
+        Index("ix_user_username", "username"),
+        Index("ix_user_is_premium_id", "is_premium", "id"),
+        Index("ix_user_is_superuser_id", "is_superuser", "id"),
+        Index("ix_user_deleted_id", "id", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     class Config:
         from_attributes = True
@@ -54,4 +97,106 @@ class Like(Base):
 
     __table_args__ = (
         UniqueConstraint('comment_id', 'user_id', name='like_user_id_IDX'),
+        # 用户点过赞的评论：user_id = ? AND comment_id IN (...)
+        Index("ix_comment_like_user_id_comment_id", "user_id", "comment_id"),
+        # 用户动态：user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_comment_like_user_id_created_at", "user_id", "created_at"),
     )
+
+
+# 每篇文章的评论数与最后评论时间，由 comment 表上的触发器增量维护（见 ARTICLE_STATS_DDL），
+# 可用 python -m app.cli rebuild-article-stats 按 comment 表重建。软删除的评论不计入
+class ArticleStats(Base):
+    __tablename__ = "article_stats"
+    article_id: Mapped[str] = mapped_column(String, primary_key=True)
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_comment_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+
+# 每个用户的评论数、点出的赞、收到的赞（未删除评论的 like_count 之和），由 comment / comment_like 上的
+# 触发器增量维护（见 USER_STATS_DDL），可用 python -m app.cli rebuild-user-stats 重建
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    likes_given: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    likes_received: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+# 评论全文检索：FTS5 外部内容表，只存索引不存原文，由 comment 表上的触发器同步。
+# trigram 分词对中文按 3 字切分，不需要额外的分词器。迁移见 alembic/versions。
+# 注意：batch 模式重建 comment 表会丢失这些触发器（包括下面的 ARTICLE_STATS_DDL、USER_STATS_DDL），
+# 之后需重新执行并 rebuild-search / rebuild-article-stats / rebuild-user-stats
+COMMENT_FTS_DDL = [
+    "CREATE VIRTUAL TABLE comment_fts USING fts5(content, content='comment', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER comment_fts_ai AFTER INSERT ON comment BEGIN "
+    "INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER comment_fts_ad AFTER DELETE ON comment BEGIN "
+    "INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    # 只在 content 变化时更新索引，like_count 等字段的高频更新不受影响
+    "CREATE TRIGGER comment_fts_au AFTER UPDATE OF content ON comment BEGIN "
+    "INSERT INTO comment_fts(comment_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO comment_fts(rowid, content) VALUES (new.id, new.content); END",
+]
+
+for statement in COMMENT_FTS_DDL:
+    event.listen(Comment.__table__, "after_create", DDL(statement))
+event.listen(Comment.__table__, "before_drop", DDL("DROP TABLE IF EXISTS comment_fts"))
+
+
+ARTICLE_STATS_DDL = [
+    "CREATE TRIGGER article_stats_ai AFTER INSERT ON comment WHEN new.deleted_at IS NULL BEGIN "
+    "INSERT INTO article_stats(article_id, comment_count, last_comment_at) VALUES (new.article_id, 1, new.created_at) "
+    "ON CONFLICT(article_id) DO UPDATE SET comment_count = comment_count + 1, "
+    "last_comment_at = max(coalesce(last_comment_at, ''), excluded.last_comment_at); END",
+    # 数据库级联删除（回复、用户的评论）同样会触发。
+    # 删掉的正好是最新一条时才重新取最后评论时间（CASE 惰性求值，其余情况不扫表），没有剩余评论时为 NULL
+    "CREATE TRIGGER article_stats_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+    "UPDATE article_stats SET comment_count = comment_count - 1, "
+    "last_comment_at = CASE WHEN old.created_at >= last_comment_at THEN "
+    "(SELECT max(created_at) FROM comment WHERE article_id = old.article_id AND deleted_at IS NULL) "
+    "ELSE last_comment_at END "
+    "WHERE article_id = old.article_id; END",
+    "CREATE TRIGGER article_stats_tombstone AFTER UPDATE OF deleted_at ON comment "
+    "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+    "UPDATE article_stats SET comment_count = comment_count - 1, "
+    "last_comment_at = CASE WHEN new.created_at >= last_comment_at THEN "
+    "(SELECT max(created_at) FROM comment WHERE article_id = new.article_id AND deleted_at IS NULL) "
+    "ELSE last_comment_at END "
+    "WHERE article_id = new.article_id; END",
+]
+
+for statement in ARTICLE_STATS_DDL:
+    event.listen(Comment.__table__, "after_create", DDL(statement))
+
+
+USER_STATS_DDL = [
+    "CREATE TRIGGER user_stats_comment_ai AFTER INSERT ON comment WHEN new.deleted_at IS NULL BEGIN "
+    "INSERT INTO user_stats(user_id, comment_count) VALUES (new.user_id, 1) "
+    "ON CONFLICT(user_id) DO UPDATE SET comment_count = comment_count + 1; END",
+    "CREATE TRIGGER user_stats_comment_ad AFTER DELETE ON comment WHEN old.deleted_at IS NULL BEGIN "
+    "UPDATE user_stats SET comment_count = comment_count - 1, likes_received = likes_received - old.like_count "
+    "WHERE user_id = old.user_id; END",
+    "CREATE TRIGGER user_stats_comment_tombstone AFTER UPDATE OF deleted_at ON comment "
+    "WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN "
+    "UPDATE user_stats SET comment_count = comment_count - 1, likes_received = likes_received - new.like_count "
+    "WHERE user_id = new.user_id; END",
+    # 点赞接口、点赞缓冲、注销撤回点赞都通过 like_count 的变化体现
+    "CREATE TRIGGER user_stats_like_count AFTER UPDATE OF like_count ON comment "
+    "WHEN new.deleted_at IS NULL AND new.like_count != old.like_count BEGIN "
+    "UPDATE user_stats SET likes_received = likes_received + new.like_count - old.like_count "
+    "WHERE user_id = new.user_id; END",
+]
+
+USER_STATS_LIKE_DDL = [
+    "CREATE TRIGGER user_stats_like_ai AFTER INSERT ON comment_like BEGIN "
+    "INSERT INTO user_stats(user_id, likes_given) VALUES (new.user_id, 1) "
+    "ON CONFLICT(user_id) DO UPDATE SET likes_given = likes_given + 1; END",
+    # 评论被删除时级联删除的点赞同样会触发
+    "CREATE TRIGGER user_stats_like_ad AFTER DELETE ON comment_like BEGIN "
+    "UPDATE user_stats SET likes_given = likes_given - 1 WHERE user_id = old.user_id; END",
+]
+
+for statement in USER_STATS_DDL:
+    event.listen(Comment.__table__, "after_create", DDL(statement))
+for statement in USER_STATS_LIKE_DDL:
+    event.listen(Like.__table__, "after_create", DDL(statement))
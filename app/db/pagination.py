@@ -0,0 +1,37 @@
+# 管理后台列表的公共工具：按 id 倒序的 keyset 分页、前缀过滤、带缓存的总数、批量操作的上限
+from datetime import datetime, timezone
+from typing import Any, Hashable
+
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from config import settings
+
+MAX_PAGE_SIZE = 100
+# 批量操作一次最多处理的 id 数，远低于 SQLite 的绑定参数上限
+MAX_BULK_IDS = 1000
+
+# 总数按过滤条件缓存，翻页时不用每次 count(*)
+_count_cache = TTLCache(512, settings.ADMIN_COUNT_TTL)
+
+
+# 前缀匹配改写成范围查询，普通（BINARY）索引即可命中，不依赖 LIKE 优化
+def prefix_range(column, prefix: str) -> list[ColumnElement]:
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return [column >= prefix, column < upper]
+
+
+# 带时区的时间统一转成数据库里存的 UTC naive 时间
+def to_db_time(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def cached_count(session: AsyncSession, key: Hashable, model: Any, conditions: list[ColumnElement]) -> int:
+    total = _count_cache.get(key)
+    if total is None:
+        total = (await session.execute(select(func.count()).select_from(model).where(*conditions))).scalar_one()
+        _count_cache.set(key, total)
+    return total
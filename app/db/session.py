@@ -1,12 +1,31 @@
 from collections.abc import AsyncGenerator
+from fastapi import Request
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
 
-DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+from config import settings
+
+DATABASE_URL = settings.DATABASE_URL
+_url = make_url(DATABASE_URL)
+_is_sqlite_file = _url.get_backend_name() == "sqlite" and _url.database not in (None, "", ":memory:")
 
 # 数据库“引擎”，负责连接数据库本体。
 # 📌 用它来创建连接、执行建表、事务等底层操作。
+# ✍️ 写引擎只有一个连接：SQLite 同一时刻只允许一个写者，所有写事务在这里排队，避免 "database is locked"
+
+engine = create_async_engine(DATABASE_URL, pool_size=1, max_overflow=0) if _is_sqlite_file else create_async_engine(DATABASE_URL)
+
+# 📖 只读引擎：WAL 模式下读者不会被写者阻塞，GET 请求都走这里
+_read_url = _url.set(database=f"file:{_url.database}", query={**_url.query, "mode": "ro", "uri": "true"}) if _is_sqlite_file else _url
+if _is_sqlite_file and settings.DB_READ_POOL_SIZE > 0:
+    read_engine = create_async_engine(_read_url, pool_size=settings.DB_READ_POOL_SIZE, max_overflow=0)
+else:
+    read_engine = engine
 
-engine = create_async_engine(DATABASE_URL)
+# 📦 导出专用的只读引擎：流式导出会占着连接直到下载结束，不能借请求的读连接池。
+# 不用连接池，每个导出单独开连接、结束即关闭，并发数由 app/exports 控制
+export_engine = create_async_engine(_read_url, poolclass=NullPool) if _is_sqlite_file else read_engine
 
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
@@ -18,14 +37,61 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
 
+
+def _apply_pragmas(dbapi_connection, pragmas: list[str]) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+if _is_sqlite_file:
+    _shared_pragmas = [
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+    ]
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_writer_pragma(dbapi_connection, connection_record):
+        # journal_mode 会持久化到数据库文件里，只需由写连接设置
+        _apply_pragmas(dbapi_connection, [
+            f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+            f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+            *_shared_pragmas,
+        ])
+
+    def set_reader_pragma(dbapi_connection, connection_record):
+        _apply_pragmas(dbapi_connection, ["PRAGMA query_only=ON", *_shared_pragmas])
+
+    for _reader in {read_engine, export_engine} - {engine}:
+        event.listen(_reader.sync_engine, "connect", set_reader_pragma)
+
+# 📊 统计每个请求的 SQL 条数与耗时（见 app/metrics.py）
+if settings.METRICS_ENABLED:
+    from app.metrics import instrument_engine
+
+    for _engine in {engine, read_engine, export_engine}:
+        instrument_engine(_engine.sync_engine)
+
 # 会话工厂，帮你生成“数据库会话”对象，用于操作表数据。
 # 📌 你可以从它生成 AsyncSession 来进行增删改查。
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+export_session_maker = async_sessionmaker(export_engine, expire_on_commit=False)
 
 # FastAPI 的依赖函数，用来在每个请求中获取一个独立的数据库会话。
 # 📌 保证数据库操作的独立性、安全性和自动关闭。
+# 📌 GET / HEAD 请求拿只读会话，其余请求拿串行化的写会话。
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    maker = read_session_maker if request.method in ("GET", "HEAD") else async_session_maker
+    async with maker() as session:
+        yield session
+
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+# 只读的 POST 接口（如批量查询点赞状态）也用只读会话，不占用写连接
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_maker() as session:
         yield session
@@ -0,0 +1,34 @@
+# 管理员数据导出，挂载在 /admin/export
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.db.models import User
+from app.users.manager import current_super_user
+from app.exports.stream import FORMATS, export_chunks, export_slots, export_stmt
+from app.responses import ReleasingStreamingResponse
+
+router = APIRouter()
+
+
+@router.get("/{entity}")
+async def export(
+    entity: Literal["users", "comments", "likes"],
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="导出格式"),
+    article_id: str | None = Query(None, description="按文章过滤（评论、点赞）"),
+    user_id: int | None = Query(None, description="按用户过滤（评论、点赞）"),
+    since: datetime | None = Query(None, description="起始时间（含，评论、点赞）"),
+    until: datetime | None = Query(None, description="截止时间（不含，评论、点赞）"),
+    admin: User = Depends(current_super_user),
+):
+    stmt = export_stmt(entity, article_id, user_id, since, until)
+    # 名额在响应结束时归还，包括客户端在开始下载前就断开的情况
+    if not export_slots.acquire():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="导出任务过多，请稍后重试")
+    return ReleasingStreamingResponse(
+        export_chunks(stmt, format),
+        export_slots.release,
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
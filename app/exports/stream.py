@@ -0,0 +1,112 @@
+# 流式导出：session.stream() 按批从游标取行，边读边编码成 NDJSON / CSV，内存占用与总行数无关
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+
+from sqlalchemy import ColumnElement, Select
+from sqlalchemy.future import select
+
+from app.db.models import Comment, Like, User
+from app.db.pagination import to_db_time
+from app.db.session import export_session_maker
+from config import settings
+from app.responses import dumps
+
+# 每批从数据库取的行数，也是每次写出的块大小
+CHUNK_ROWS = 1000
+
+# 导出的列，用户表不包含密码哈希
+EXPORT_COLUMNS: Dict[str, List[ColumnElement]] = {
+    "users": [User.id, User.email, User.username, User.is_active, User.is_superuser, User.is_verified,
+              User.is_premium, User.premium_end_at, User.deleted_at],
+    "comments": [Comment.id, Comment.article_id, Comment.parent_id, Comment.user_id, Comment.content,
+                 Comment.like_count, Comment.created_at, Comment.deleted_at],
+    "likes": [Like.id, Like.comment_id, Like.user_id, Like.created_at],
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+# article_id / user_id / 时间范围只对评论和点赞生效，按 id 顺序输出
+def export_stmt(
+    entity: str,
+    article_id: str | None = None,
+    user_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Select:
+    columns = EXPORT_COLUMNS[entity]
+    stmt = select(*columns).order_by(columns[0])
+    if entity == "comments":
+        if article_id is not None:
+            stmt = stmt.where(Comment.article_id == article_id)
+        if user_id is not None:
+            stmt = stmt.where(Comment.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(Comment.created_at >= to_db_time(since))
+        if until is not None:
+            stmt = stmt.where(Comment.created_at < to_db_time(until))
+    elif entity == "likes":
+        if article_id is not None:
+            stmt = stmt.where(Like.comment_id.in_(select(Comment.id).where(Comment.article_id == article_id)))
+        if user_id is not None:
+            stmt = stmt.where(Like.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(Like.created_at >= to_db_time(since))
+        if until is not None:
+            stmt = stmt.where(Like.created_at < to_db_time(until))
+    return stmt
+
+
+def encode_ndjson(keys: List[str], rows) -> bytes:
+    return b"".join(dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+# 同时进行的导出数。导出连接不走读连接池，但每个导出都长时间占着一个连接和一段 WAL 快照，仍要限制数量
+class ExportSlots:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        if self.active >= self.limit:
+            self.rejected += 1
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {"active": self.active, "limit": self.limit, "rejected": self.rejected}
+
+
+export_slots = ExportSlots(settings.EXPORT_MAX_CONCURRENT)
+
+
+# 会话在生成器内部打开：StreamingResponse 开始发送时请求依赖里的会话已经关闭。
+# 用导出专用的引擎，下载再慢也不会占住请求的读连接池
+async def export_chunks(stmt: Select, fmt: str) -> AsyncIterator[bytes]:
+    keys = [column.name for column in stmt.selected_columns]
+    if fmt == "csv":
+        # 带 BOM，Excel 打开中文不乱码
+        yield "\ufeff".encode("utf-8") + encode_csv([keys])
+
+    async with export_session_maker() as session:
+        result = await session.stream(stmt.execution_options(yield_per=CHUNK_ROWS))
+        async for rows in result.partitions():
+            yield encode_ndjson(keys, rows) if fmt == "ndjson" else encode_csv(rows)
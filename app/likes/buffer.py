@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.models import Comment, Like, User
+from app.db.session import async_session_maker
+from app.comments import events
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 单条语句里最多带多少组参数，避免超过 SQLite 的变量数上限
+CHUNK_SIZE = 500
+
+
+# 写回式点赞缓冲：点赞 / 取消点赞先进内存，同一 (评论, 用户) 只保留最后一次操作，
+# 后台任务按批量 INSERT ... ON CONFLICT DO NOTHING 与批量 DELETE 写入
+class LikeBuffer:
+    def __init__(self, flush_size: int, flush_interval: float):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[int, int], bool] = {}
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self.collapsed = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def like(self, comment_id: int, user_id: int) -> None:
+        self._put((comment_id, user_id), True)
+
+    def unlike(self, comment_id: int, user_id: int) -> None:
+        self._put((comment_id, user_id), False)
+
+    # 尚未写库的操作：True 点赞 / False 取消 / None 没有
+    def pending(self, comment_id: int, user_id: int) -> bool | None:
+        return self._pending.get((comment_id, user_id))
+
+    def _put(self, key: tuple[int, int], liked: bool) -> None:
+        # 点赞后又取消（或反之）会互相抵消，只留下最终状态
+        if key in self._pending:
+            self.collapsed += 1
+        self._pending[key] = liked
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    # 不取消后台任务：取消会打断正在写的批次，而那批操作已经移出 _pending，会悄悄丢失。
+    # 只通知循环退出，等它写完当前批次，再把剩余的操作全部写入
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                try:
+                    await self._write(batch)
+                    self.flushes += 1
+                except asyncio.CancelledError:
+                    # 被外部取消（如进程退出）：把这批放回去，不覆盖之后入队的新操作
+                    self._pending = {**batch, **self._pending}
+                    raise
+                except Exception:
+                    self.dropped += len(batch)
+                    logger.exception("点赞缓冲写入失败，丢弃 %d 条操作", len(batch))
+
+    async def _write(self, batch: dict[tuple[int, int], bool]) -> None:
+        now = datetime.now(tz=timezone.utc)
+        keys = list(batch)
+        deltas: Counter[int] = Counter()
+
+        async with async_session_maker() as session:
+            for start in range(0, len(keys), CHUNK_SIZE):
+                chunk = keys[start:start + CHUNK_SIZE]
+                likes = [key for key in chunk if batch[key]]
+                unlikes = [key for key in chunk if not batch[key]]
+
+                if likes:
+                    # 评论或用户可能在入队后被删除，先过滤掉，避免外键错误让整批失败；
+                    # 与直接写入（set_liked）一致，入队后才变成墓碑的评论也不再改动点赞
+                    comment_ids = set((await session.execute(
+                        select(Comment.id).where(Comment.id.in_({c for c, _ in likes}), Comment.deleted_at.is_(None))
+                    )).scalars().all())
+                    user_ids = set((await session.execute(
+                        select(User.id).where(User.id.in_({u for _, u in likes}))
+                    )).scalars().all())
+                    rows = [
+                        {"comment_id": c, "user_id": u, "created_at": now}
+                        for c, u in likes
+                        if c in comment_ids and u in user_ids
+                    ]
+                    if rows:
+                        result = await session.execute(
+                            sqlite_insert(Like)
+                            .values(rows)
+                            .on_conflict_do_nothing(index_elements=[Like.comment_id, Like.user_id])
+                            .returning(Like.comment_id)
+                        )
+                        deltas.update(result.scalars().all())
+
+                if unlikes:
+                    result = await session.execute(
+                        delete(Like)
+                        .where(
+                            tuple_(Like.comment_id, Like.user_id).in_(unlikes),
+                            Like.comment_id.in_(
+                                select(Comment.id).where(Comment.id.in_({c for c, _ in unlikes}), Comment.deleted_at.is_(None))
+                            ),
+                        )
+                        .returning(Like.comment_id)
+                    )
+                    deltas.subtract(result.scalars().all())
+
+            changed = {comment_id: delta for comment_id, delta in deltas.items() if delta}
+            if not changed:
+                await session.commit()
+                return
+
+            await session.execute(
+                update(Comment.__table__)
+                .where(Comment.__table__.c.id == bindparam("comment_id"))
+                .values(like_count=Comment.__table__.c.like_count + bindparam("delta")),
+                [{"comment_id": comment_id, "delta": delta} for comment_id, delta in changed.items()],
+            )
+            counts = (await session.execute(
+                select(Comment.id, Comment.article_id, Comment.like_count).where(Comment.id.in_(list(changed)))
+            )).all()
+            await session.commit()
+
+        for comment_id, article_id, like_count in counts:
+            events.like_changed(article_id, comment_id, like_count)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "collapsed": self.collapsed,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+        }
+
+
+like_buffer = LikeBuffer(settings.LIKE_BUFFER_FLUSH_SIZE, settings.LIKE_BUFFER_FLUSH_INTERVAL)
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from typing import Iterable, List
+from sqlalchemy import DateTime, Select, delete, exists, literal, update, select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Comment, Like
+
+
+# 点赞 / 取消点赞时在同一事务内调整 Comment.like_count，返回 (article_id, 新的点赞数)
+async def adjust_like_count(session: AsyncSession, comment_id: int, delta: int) -> tuple[str, int] | None:
+    result = await session.execute(
+        update(Comment)
+        .where(Comment.id == comment_id)
+        .values(like_count=Comment.like_count + delta)
+        .returning(Comment.article_id, Comment.like_count)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else None
+
+
+# 幂等的点赞 / 取消点赞。点赞是一条 INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING：评论不存在或已删除时
+# SELECT 没有行，重复点赞被 ON CONFLICT 忽略；取消是一条 DELETE ... RETURNING，同样限定评论未删除。只有真正插入 / 删除了才调整计数。
+# 返回 (article_id, 点赞数, 是否有变化)，评论不存在时返回 None
+async def set_liked(session: AsyncSession, comment_id: int, user_id: int, liked: bool) -> tuple[str, int, bool] | None:
+    # 点赞和取消都只作用于未删除的评论，墓碑上的点赞保持原样，由清理任务随评论一起删除
+    visible = select(Comment.id).where(Comment.id == comment_id, Comment.deleted_at.is_(None))
+    if liked:
+        result = await session.execute(
+            sqlite_insert(Like)
+            .from_select(
+                ["comment_id", "user_id", "created_at"],
+                visible.add_columns(literal(user_id), literal(datetime.now(tz=timezone.utc), DateTime)),
+            )
+            .on_conflict_do_nothing(index_elements=[Like.comment_id, Like.user_id])
+            .returning(Like.id)
+        )
+    else:
+        result = await session.execute(
+            delete(Like)
+            .where(Like.comment_id.in_(visible), Like.user_id == user_id)
+            .returning(Like.id)
+            .execution_options(synchronize_session=False)
+        )
+    if result.first() is not None:
+        counted = await adjust_like_count(session, comment_id, 1 if liked else -1)
+        return (*counted, True) if counted else None
+
+    row = (await session.execute(
+        select(Comment.article_id, Comment.like_count).where(Comment.id == comment_id, Comment.deleted_at.is_(None))
+    )).first()
+    return (row[0], row[1], False) if row else None
+
+
+# 一组评论的点赞数和当前用户是否点过赞：按主键取评论，liked 走 (comment_id, user_id) 唯一索引，一条语句
+def like_state_stmt(user_id: int | None, comment_ids: List[int]) -> Select:
+    liked = (
+        exists().where(Like.comment_id == Comment.id, Like.user_id == user_id)
+        if user_id is not None else literal(False)
+    )
+    return select(Comment.id, Comment.like_count, liked.label("liked")).where(Comment.id.in_(comment_ids))
+
+
+# 按 comment_like 表重新统计点赞数，comment_ids 为空时修复全部评论
+async def recount_like_counts(session: AsyncSession, comment_ids: Iterable[int] | None = None) -> int:
+    actual = (
+        select(func.count())
+        .where(Like.comment_id == Comment.id)
+        .scalar_subquery()
+    )
+    stmt = update(Comment).values(like_count=actual)
+    if comment_ids is not None:
+        stmt = stmt.where(Comment.id.in_(list(comment_ids)))
+    result = await session.execute(stmt)
+    return result.rowcount
+
+
+# 删除用户前撤回他的点赞：被赞评论的计数减一，再删掉点赞行，都是集合操作。
+# limit 为空时一次处理全部，否则按 comment_id 顺序每次最多 limit 条，返回受影响评论所在的文章
+async def release_user_likes(session: AsyncSession, user_id: int, limit: int | None = None) -> list[str]:
+    liked = select(Like.comment_id).where(Like.user_id == user_id).order_by(Like.comment_id)
+    if limit is not None:
+        liked = liked.limit(limit)
+    result = await session.execute(
+        update(Comment)
+        .where(Comment.id.in_(liked.scalar_subquery()))
+        .values(like_count=Comment.like_count - 1)
+        .returning(Comment.article_id)
+        .execution_options(synchronize_session=False)
+    )
+    article_ids = list(set(result.scalars().all()))
+    await session.execute(
+        delete(Like)
+        .where(Like.user_id == user_id, Like.comment_id.in_(liked.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    return article_ids
@@ -1,53 +1,89 @@
 from sqlalchemy.future import select
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
-from app.db.models import Like, User, Comment
-from app.db.session import get_async_session
-from app.users.manager import current_active_user
+from app.db.models import User, Comment
+from app.db.session import get_async_session, get_read_session
+from app.users.manager import current_active_user, current_active_user_optional_read
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from app.likes.schemas import LikeCreate, LikeRead, LikeDelete
-from datetime import datetime, timezone
+from app.likes.schemas import LikeCreate, LikeRead, LikeState, LikeStateQuery, LikeStates
+from app.likes.counters import set_liked, like_state_stmt
+from app.likes.buffer import like_buffer
+from app.comments import events
+from app.ratelimit import limit_likes
 
 router = APIRouter(prefix="/likes", tags=["likes"])
 
-@router.post("", response_model=LikeRead)
+
+# 点赞 / 取消点赞的公共实现，重复操作不报错，返回最新的点赞数
+async def apply_like(session: AsyncSession, comment_id: int, user_id: int, liked: bool) -> LikeState:
+    # 缓冲模式：只入队，由后台任务批量写库，返回的点赞数是写库前的值
+    if like_buffer.running:
+        like_count = await session.scalar(
+            select(Comment.like_count).where(Comment.id == comment_id, Comment.deleted_at.is_(None))
+        )
+        if like_count is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+        if liked:
+            like_buffer.like(comment_id, user_id)
+        else:
+            like_buffer.unlike(comment_id, user_id)
+        return LikeState(comment_id=comment_id, liked=liked, like_count=like_count)
+
+    counted = await set_liked(session, comment_id, user_id, liked)
+    if counted is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+    article_id, like_count, changed = counted
+    if changed:
+        await session.commit()
+        events.like_changed(article_id, comment_id, like_count)
+    return LikeState(comment_id=comment_id, liked=liked, like_count=like_count)
+
+
+@router.post("", response_model=LikeRead, dependencies=[Depends(limit_likes)])
 async def create_like(
     like: LikeCreate,
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_active_user),
 ):
-    new_like = Like(
-        comment_id=like.comment_id,
-        user_id=current_user.id,
-        created_at=datetime.now(tz=timezone.utc),
-    )
-    session.add(new_like)
-    await session.commit()
-    await session.refresh(new_like)
-    return new_like
-
-@router.delete("/{comment_id}", response_model=LikeRead)
+    await apply_like(session, like.comment_id, current_user.id, True)
+    return LikeRead(comment_id=like.comment_id, user_id=current_user.id)
+
+
+# 幂等点赞，已经点过赞时不变
+@router.put("/{comment_id}", response_model=LikeState, dependencies=[Depends(limit_likes)])
+async def put_like(
+    comment_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    return await apply_like(session, comment_id, current_user.id, True)
+
+
+# 幂等取消点赞，没有点过赞时不变
+@router.delete("/{comment_id}", response_model=LikeState, dependencies=[Depends(limit_likes)])
 async def delete_like(
     comment_id: int,
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_active_user),
 ):
-    like_obj = await session.execute(
-        select(Like).where(
-            Like.comment_id == comment_id,
-            Like.user_id == current_user.id,
-        )
-    )
-    like_obj = like_obj.scalars().first()
-    if not like_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Like not found",
-        )
-    else:
-        await session.delete(like_obj)
-        await session.commit()
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "Like deleted"})
\ No newline at end of file
+    return await apply_like(session, comment_id, current_user.id, False)
+
+
+# 批量查询点赞状态，客户端刷新点赞数 / 是否已赞时不用重新拉取整个评论页；未登录时 liked 都为 false
+@router.post("/state", response_model=LikeStates)
+async def like_state(
+    query: LikeStateQuery,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User | None = Depends(current_active_user_optional_read),
+):
+    user_id = current_user.id if current_user else None
+    rows = {row.id: row for row in (await session.execute(like_state_stmt(user_id, query.comment_ids))).all()}
+    items = []
+    for comment_id in dict.fromkeys(query.comment_ids):
+        row = rows.get(comment_id)
+        if row is None:
+            continue
+        # 缓冲里还没写库的操作以它为准
+        pending = like_buffer.pending(comment_id, user_id) if user_id is not None else None
+        items.append(LikeState(comment_id=comment_id, liked=bool(row.liked) if pending is None else pending, like_count=row.like_count))
+    return LikeStates(items=items)
@@ -1,4 +1,9 @@
-from pydantic import BaseModel
+from typing import List
+
+from pydantic import BaseModel, Field
+
+# /likes/state 一次最多查询的评论数
+MAX_STATE_IDS = 200
 
 class LikeCreate(BaseModel):
     comment_id: int
@@ -8,4 +13,16 @@ class LikeDelete(BaseModel):
 
 class LikeRead(BaseModel):
     comment_id: int
-    user_id: int
\ No newline at end of file
+    user_id: int
+
+# PUT / DELETE /likes/{comment_id} 与 /likes/state 的结果
+class LikeState(BaseModel):
+    comment_id: int
+    liked: bool
+    like_count: int
+
+class LikeStateQuery(BaseModel):
+    comment_ids: List[int] = Field(..., min_length=1, max_length=MAX_STATE_IDS)
+
+class LikeStates(BaseModel):
+    items: List[LikeState]  # 与请求顺序一致，不存在的评论不返回
@@ -1,15 +1,47 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.users.router import router as users_router
 from app.comments.router import router as comments_router  # 未来模块
 from app.likes.router import router as likes_router
 from app.users.admin_router import router as admin_router
+from app.exports.router import router as export_router
+
+from app.bus import bus
+from app.likes.buffer import like_buffer
+from app.comments.cache import comment_tree_cache
+from app.comments.live import live_hub
+from app.users.cache import user_cache
+from app.metrics import MetricsMiddleware, register_stats, router as metrics_router
+from app.users.tasks import leader_loop
+from app.users.passwords import password_pool
+from app.ratelimit import comment_limiter, like_limiter
+from app.exports.stream import export_slots
 
 from config import settings
 
-app = FastAPI(root_path=settings.ROOT)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    bus.start()
+    if settings.LIKE_BUFFER_ENABLED:
+        await like_buffer.start()
+    # 多 worker 时只有拿到 leader 锁的 worker 跑定时清理，其余的定期重试
+    background_tasks = [asyncio.create_task(leader_loop(settings.LEADER_RETRY_INTERVAL))]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    # 关闭时把缓冲中的点赞写完
+    await like_buffer.stop()
+    password_pool.shutdown()
+    bus.stop()
+
+
+app = FastAPI(root_path=settings.ROOT, lifespan=lifespan)
 
 # 全局中间件
 app.add_middleware(
@@ -20,8 +52,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 大响应（如长评论串）按需 gzip 压缩，GZIP_MINIMUM_SIZE=0 时关闭
+if settings.GZIP_MINIMUM_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_LEVEL)
+
+# 请求耗时与 SQL 统计，放在最外层以覆盖其他中间件的开销
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    register_stats("comment_cache", comment_tree_cache.stats)
+    register_stats("user_cache", user_cache.stats)
+    register_stats("like_buffer", like_buffer.stats)
+    register_stats("live", live_hub.stats)
+    register_stats("password_pool", password_pool.stats)
+    register_stats("bus", bus.stats)
+    register_stats("rate_limit_comments", comment_limiter.stats)
+    register_stats("rate_limit_likes", like_limiter.stats)
+    register_stats("exports", export_slots.stats)
+    app.include_router(metrics_router)
+
 # 挂载子路由
 app.include_router(users_router)
 app.include_router(comments_router)
 app.include_router(likes_router)
 app.include_router(admin_router, prefix="/admin", tags=["admin"])
+app.include_router(export_router, prefix="/admin/export", tags=["admin"])
@@ -0,0 +1,195 @@
+# 请求与 SQL 埋点，/metrics 以 Prometheus 文本格式输出
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+# 当前请求内的数据库统计，由中间件设置，SQLAlchemy 钩子累加
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+request_latency: dict[tuple, Histogram] = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+request_queries: dict[tuple, Histogram] = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+request_db_seconds: dict[tuple, float] = defaultdict(float)
+n_plus_one_total: dict[tuple, int] = defaultdict(int)
+# 密码哈希 / 校验耗时（含在线程池里排队的时间），按操作区分
+password_hash_seconds: dict[str, Histogram] = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+db_queries_total = 0
+db_seconds_total = 0.0
+
+# 其他模块的统计（缓存命中等），渲染时调用，输出为 gauge
+_collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(prefix: str, collect: Callable[[], dict]) -> None:
+    _collectors[prefix] = collect
+
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        global db_queries_total, db_seconds_total
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_queries_total += 1
+        db_seconds_total += elapsed
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+
+# 纯 ASGI 中间件，按路由模板（而不是实际路径）统计，避免标签基数爆炸
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            key = (scope["method"], path, str(status_code))
+            request_latency[key].observe(elapsed)
+            request_queries[key].observe(stats.queries)
+            request_db_seconds[key] += stats.db_time
+            if stats.queries > settings.N_PLUS_ONE_THRESHOLD:
+                n_plus_one_total[(scope["method"], path)] += 1
+                logger.warning(
+                    "疑似 N+1 查询：%s %s 执行了 %d 条 SQL（阈值 %d）",
+                    scope["method"], path, stats.queries, settings.N_PLUS_ONE_THRESHOLD,
+                )
+
+
+def _labels(key: tuple, names: tuple = ("method", "route", "status")) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, key))
+
+
+def render() -> str:
+    lines = [
+        "# HELP vocabili_http_request_duration_seconds 请求耗时",
+        "# TYPE vocabili_http_request_duration_seconds histogram",
+    ]
+    for key, histogram in list(request_latency.items()):
+        lines.extend(histogram.render("vocabili_http_request_duration_seconds", _labels(key)))
+
+    lines += [
+        "# HELP vocabili_http_request_db_queries 每个请求执行的 SQL 条数",
+        "# TYPE vocabili_http_request_db_queries histogram",
+    ]
+    for key, histogram in list(request_queries.items()):
+        lines.extend(histogram.render("vocabili_http_request_db_queries", _labels(key)))
+
+    lines += [
+        "# HELP vocabili_http_request_db_seconds_total 请求内的数据库耗时",
+        "# TYPE vocabili_http_request_db_seconds_total counter",
+    ]
+    lines += [f"vocabili_http_request_db_seconds_total{{{_labels(key)}}} {value}" for key, value in list(request_db_seconds.items())]
+
+    lines += [
+        "# HELP vocabili_n_plus_one_total SQL 条数超过阈值的请求数",
+        "# TYPE vocabili_n_plus_one_total counter",
+    ]
+    lines += [f"vocabili_n_plus_one_total{{{_labels(key, ('method', 'route'))}}} {value}" for key, value in list(n_plus_one_total.items())]
+
+    lines += [
+        "# HELP vocabili_password_hash_seconds 密码哈希 / 校验耗时",
+        "# TYPE vocabili_password_hash_seconds histogram",
+    ]
+    for op, histogram in list(password_hash_seconds.items()):
+        lines.extend(histogram.render("vocabili_password_hash_seconds", f'op="{op}"'))
+
+    lines += [
+        "# HELP vocabili_db_queries_total 执行的 SQL 总数（含后台任务）",
+        "# TYPE vocabili_db_queries_total counter",
+        f"vocabili_db_queries_total {db_queries_total}",
+        "# HELP vocabili_db_seconds_total 数据库总耗时（含后台任务）",
+        "# TYPE vocabili_db_seconds_total counter",
+        f"vocabili_db_seconds_total {db_seconds_total}",
+    ]
+
+    for prefix, collect in _collectors.items():
+        for name, value in collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE vocabili_{prefix}_{name} gauge")
+                lines.append(f"vocabili_{prefix}_{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,109 @@
+# 写接口的进程内限流：按用户和 IP 各一个令牌桶，桶空时返回 429 和 Retry-After。
+# 只挂在写路由上，读接口没有任何额外开销。多 worker 时每个进程各自计数
+import math
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.db.models import User
+from app.users.manager import current_active_user, is_premium_active
+from config import settings
+
+
+# "次数/秒数"：桶容量为次数，每秒补充 次数/秒数 个令牌
+def parse_limit(spec: str) -> Tuple[float, float]:
+    count, seconds = spec.split("/")
+    return float(count), float(seconds)
+
+
+class RateLimiter:
+    def __init__(self, capacity: float, period: float, max_keys: int):
+        self.capacity = capacity
+        self.period = period
+        self.max_keys = max_keys
+        # key -> [剩余令牌, 上次更新时间]，按最近使用排序
+        self._buckets: OrderedDict[Hashable, list] = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.period > 0
+
+    # 从每个桶各取一个令牌，全部有令牌才一起扣，任一桶不够就都不扣。scale 同时放大容量和补充速度（会员、IP）。
+    # 返回需要等待的秒数（取最长的），0 表示放行
+    def acquire(self, *buckets: Tuple[Hashable, float]) -> float:
+        now = time.monotonic()
+        current = []
+        wait = 0.0
+        for key, scale in buckets:
+            capacity = self.capacity * scale
+            rate = capacity / self.period
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+            current.append((key, tokens))
+        if wait:
+            self.limited += 1
+            return wait
+        for key, tokens in current:
+            self._store(key, tokens - 1, now)
+        self.allowed += 1
+        return 0.0
+
+    def _store(self, key: Hashable, tokens: float, now: float) -> None:
+        self._buckets[key] = [tokens, now]
+        self._buckets.move_to_end(key)
+        # 闲置超过一个周期的桶已经补满，和没有桶等价，从最久未用的一端删掉
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if now - oldest[1] < self.period and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+
+def _limiter(spec: str) -> RateLimiter:
+    capacity, period = parse_limit(spec) if settings.RATE_LIMIT_ENABLED else (0, 0)
+    return RateLimiter(capacity, period, settings.RATE_LIMIT_MAX_KEYS)
+
+
+comment_limiter = _limiter(settings.RATE_LIMIT_COMMENTS)
+like_limiter = _limiter(settings.RATE_LIMIT_LIKES)
+
+
+# 路由依赖：同时检查用户桶和 IP 桶（同一出口的多个用户共用，额度更宽），被任一方拒绝的请求不消耗另一方的额度。
+# 管理员不限流
+def rate_limit(limiter: RateLimiter):
+    async def dependency(request: Request, user: User = Depends(current_active_user)) -> None:
+        if not limiter.enabled or user.is_superuser:
+            return
+        scale = settings.RATE_LIMIT_PREMIUM_FACTOR if is_premium_active(user) else 1.0
+        buckets = [(("user", user.id), scale)]
+        if request.client is not None:
+            buckets.append((("ip", request.client.host), settings.RATE_LIMIT_IP_FACTOR))
+        wait = limiter.acquire(*buckets)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="操作太频繁，请稍后再试",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
+
+
+limit_comments = rate_limit(comment_limiter)
+limit_likes = rate_limit(like_limiter)
@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime
+from typing import Any, Callable
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# orjson 为可选依赖，没装时退回标准库
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+# 直接序列化普通 dict / list，不再经过 response_model 二次校验
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# 已经序列化好的 JSON（例如缓存里的页面），原样返回
+def rendered_json(body: bytes, status_code: int = 200, headers: dict | None = None) -> Response:
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+# If-None-Match 按弱比较处理（忽略 W/ 前缀），支持逗号分隔的多个值与 *
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+# 流式响应结束时（正常结束、出错、客户端断开）关闭响应体生成器并调用 release。
+# 客户端在第一块数据之前就断开时生成器从未开始执行，它自己的 finally 不会运行，
+# 在路由里预先占用的名额（SSE 订阅、导出并发数）要靠这里归还
+class ReleasingStreamingResponse(StreamingResponse):
+    def __init__(self, content, release: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                self._release()
@@ -0,0 +1,117 @@
+# 用户动态：最近的评论与点赞按时间倒序合并，keyset 分页；统计数读 user_stats（触发器维护）
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import Select, String, delete, desc, func, insert, literal, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Comment, Like, User, UserStats
+
+# 同一时刻的评论与点赞按这个顺序排列（倒序时评论在前）
+KINDS = ("like", "comment")
+
+
+# 分页按库里存的原始文本排序和比较：ORM 写入的时间带 6 位小数秒，导入的旧数据可能只到秒（"…:SS"），
+# 把游标时间重新格式化后再比较会与存储格式对不上，同一时刻的行被重复返回。游标里直接带原始文本，
+# ORDER BY、游标条件与两类合并时的排序用的是同一个值，无论存储格式如何顺序都一致
+def _text(column):
+    return type_coerce(column, String)
+
+
+# 某一类动态在游标之后的部分：排在游标前面的类型可以取同一时刻的行，后面的不行
+def _after(column, id_column, kind: str, after: Tuple[str, str, int] | None) -> list:
+    if after is None:
+        return []
+    created_at, after_kind, after_id = after
+    bound = literal(created_at, String)
+    rank, after_rank = KINDS.index(kind), KINDS.index(after_kind)
+    if rank < after_rank:
+        return [_text(column) <= bound]
+    if rank > after_rank:
+        return [_text(column) < bound]
+    return [tuple_(_text(column), id_column) < tuple_(bound, after_id)]
+
+
+# 两条语句各取一页，按 (user_id, created_at) 索引倒序读，合并后再截断，开销与页大小成正比。
+# 与其他读接口一致，已删除（墓碑）评论和它们上面的点赞都不出现
+def user_comments_stmt(user_id: int, after: Tuple | None, limit: int) -> Select:
+    return (
+        select(Comment.id, Comment.article_id, Comment.parent_id, Comment.content, Comment.like_count, Comment.created_at,
+               _text(Comment.created_at).label("sort_key"))
+        .where(Comment.user_id == user_id, Comment.deleted_at.is_(None), *_after(Comment.created_at, Comment.id, "comment", after))
+        .order_by(desc(Comment.created_at), desc(Comment.id))
+        .limit(limit)
+    )
+
+
+def user_likes_stmt(user_id: int, after: Tuple | None, limit: int) -> Select:
+    return (
+        select(Like.id, Like.comment_id, Comment.article_id, Like.created_at, _text(Like.created_at).label("sort_key"))
+        .join(Comment, Comment.id == Like.comment_id)
+        .where(Like.user_id == user_id, Comment.deleted_at.is_(None), *_after(Like.created_at, Like.id, "like", after))
+        .order_by(desc(Like.created_at), desc(Like.id))
+        .limit(limit)
+    )
+
+
+# 游标："类型:id:库里的原始时间文本"
+def encode_cursor(item: dict) -> str:
+    return f"{item['kind']}:{item['id']}:{item['sort_key']}"
+
+
+# 格式不对时抛 ValueError
+def decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    kind, item_id, created_at = cursor.split(":", 2)
+    if kind not in KINDS:
+        raise ValueError(kind)
+    datetime.fromisoformat(created_at)
+    return created_at, kind, int(item_id)
+
+
+def _sort_key(item: dict) -> tuple:
+    return item["sort_key"], KINDS.index(item["kind"]), item["id"]
+
+
+# 返回 (本页动态, 下一页游标)
+async def load_activity(session: AsyncSession, user_id: int, after: Tuple | None, limit: int) -> Tuple[List[dict], str | None]:
+    comments = await session.execute(user_comments_stmt(user_id, after, limit + 1))
+    likes = await session.execute(user_likes_stmt(user_id, after, limit + 1))
+    items = [
+        {"kind": "comment", "id": row.id, "article_id": row.article_id, "comment_id": row.id, "parent_id": row.parent_id,
+         "content": row.content, "like_count": row.like_count, "created_at": row.created_at, "sort_key": row.sort_key}
+        for row in comments
+    ] + [
+        {"kind": "like", "id": row.id, "article_id": row.article_id, "comment_id": row.comment_id,
+         "created_at": row.created_at, "sort_key": row.sort_key}
+        for row in likes
+    ]
+    items.sort(key=_sort_key, reverse=True)
+    page = items[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(items) > limit else None
+    return page, next_cursor
+
+
+async def load_stats(session: AsyncSession, user_id: int) -> dict:
+    stats = await session.get(UserStats, user_id)
+    if stats is None:
+        return {"comment_count": 0, "likes_given": 0, "likes_received": 0}
+    return {"comment_count": stats.comment_count, "likes_given": stats.likes_given, "likes_received": stats.likes_received}
+
+
+# 按 comment / comment_like 表全量重建，用于导入旧数据或计数出现偏差后修复。每个用户三个子查询都走 user_id 的索引
+async def rebuild_user_stats(session: AsyncSession) -> int:
+    visible = (Comment.user_id == User.id, Comment.deleted_at.is_(None))
+    await session.execute(delete(UserStats))
+    result = await session.execute(
+        insert(UserStats).from_select(
+            ["user_id", "comment_count", "likes_given", "likes_received"],
+            select(
+                User.id,
+                select(func.count()).where(*visible).scalar_subquery(),
+                select(func.count()).where(Like.user_id == User.id).scalar_subquery(),
+                select(func.coalesce(func.sum(Comment.like_count), 0)).where(*visible).scalar_subquery(),
+            ),
+        )
+    )
+    return result.rowcount
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, desc
 from datetime import timedelta, datetime
 
 from app.db.session import get_async_session
 from app.db.models import User
-from app.users.schemas import UserRead, UserId, UserCharge
+from app.db.pagination import MAX_PAGE_SIZE, prefix_range, cached_count
+from app.users.schemas import UserRead, UserId, UserCharge, UserPage, BulkUserIds, BulkPremium, BulkUserResult
+from app.users import bulk
 from app.users.manager import current_super_user, get_user_manager
+from app.users.cache import user_cache
 
 # 以下操作仅限管理员
 
@@ -36,6 +39,7 @@ async def set_premium(
     
 
     await session.commit()
+    user_cache.invalidate(target_user.id)
     return {
         "message": f"用户 {target_user.username} 已设置为会员，截止至 {target_user.premium_end_at.isoformat()}",
         "is_premium": target_user.is_premium,
@@ -58,6 +62,7 @@ async def set_admin(
     
     target_user.is_superuser = True
     await session.commit()
+    user_cache.invalidate(target_user.id)
     return {"message": f"用户 {target_user.username} 已设置为管理员"}
 
 # 取消管理员
@@ -75,27 +80,88 @@ async def unset_admin(
     
     target_user.is_superuser = False
     await session.commit()
+    user_cache.invalidate(target_user.id)
     return {"message": f"用户 {target_user.username} 被取消管理员身份"}
 
-# 获取所有用户
-@router.get("/list-users")
+# 批量续期会员：一条 UPDATE，会员有效则在原到期时间上延长，否则从现在算起
+@router.post("/bulk/set-premium", response_model=BulkUserResult)
+async def bulk_set_premium(
+    body: BulkPremium,
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(current_super_user),
+):
+    ids = list(dict.fromkeys(body.ids))
+    items = await bulk.extend_premium(session, ids, body.days, body.dry_run)
+    return await _finish_bulk(session, body.dry_run, items)
+
+
+# 批量设置 / 取消管理员，不会修改当前管理员自己
+@router.post("/bulk/set-admin", response_model=BulkUserResult)
+async def bulk_set_admin(
+    body: BulkUserIds,
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(current_super_user),
+):
+    items = await bulk.set_superuser(session, list(dict.fromkeys(body.ids)), True, body.dry_run, admin.id)
+    return await _finish_bulk(session, body.dry_run, items)
+
+
+@router.post("/bulk/unset-admin", response_model=BulkUserResult)
+async def bulk_unset_admin(
+    body: BulkUserIds,
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(current_super_user),
+):
+    items = await bulk.set_superuser(session, list(dict.fromkeys(body.ids)), False, body.dry_run, admin.id)
+    return await _finish_bulk(session, body.dry_run, items)
+
+
+async def _finish_bulk(session: AsyncSession, dry_run: bool, items: list[dict]) -> BulkUserResult:
+    if not dry_run:
+        await session.commit()
+        user_cache.invalidate_many(item["id"] for item in items if item["status"] == "updated")
+    return BulkUserResult(dry_run=dry_run, items=items)
+
+# 获取所有用户：按 id 倒序 keyset 分页，可按用户名 / 邮箱前缀、会员、管理员过滤
+@router.get("/list-users", response_model=UserPage)
 async def list_users(
-    page: int = Query(1, description="页码"),
-    page_size: int = Query(20, description="每页数量"),
+    cursor: int | None = Query(None, description="上一页返回的 next_cursor"),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每页数量"),
+    username: str | None = Query(None, min_length=1, description="用户名前缀"),
+    email: str | None = Query(None, min_length=1, description="邮箱前缀"),
+    is_premium: bool | None = Query(None, description="是否会员"),
+    is_superuser: bool | None = Query(None, description="是否管理员"),
     session: AsyncSession = Depends(get_async_session),
     admin: User = Depends(current_super_user),
 ):
-    stmt = (
-        select(User)
-        .order_by(desc(User.id))
-        .offset((page - 1) * page_size)
-        .limit(page_size)
+    conditions = []
+    if username:
+        conditions += prefix_range(User.username, username)
+    if email:
+        conditions += prefix_range(User.email, email)
+    if is_premium is not None:
+        conditions.append(User.is_premium == is_premium)
+    if is_superuser is not None:
+        conditions.append(User.is_superuser == is_superuser)
+
+    stmt = select(User).where(*conditions).order_by(desc(User.id)).limit(page_size + 1)
+    if cursor is not None:
+        stmt = stmt.where(User.id < cursor)
+    users = (await session.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(users) > page_size:
+        users = users[:page_size]
+        next_cursor = users[-1].id
+
+    total = await cached_count(session, ("user", username, email, is_premium, is_superuser), User, conditions)
+    return UserPage(
+        items=[UserRead.model_validate(u) for u in users],
+        next_cursor=next_cursor,
+        total=total,
     )
-    result = await session.execute(stmt)
-    users = result.scalars().all()
-    return [
-        UserRead.model_validate(u)
-        for u in users
-    ]
-    
 
+# 用户缓存统计
+@router.get("/user-cache-stats")
+async def user_cache_stats(admin: User = Depends(current_super_user)):
+    return user_cache.stats()
@@ -0,0 +1,68 @@
+# 管理后台的批量用户操作：先按主键查一次目标行（dry_run 只做这一步），再用一条 UPDATE 修改，
+# 都在同一个事务里。结果按请求中 ids 的顺序逐个返回：updated / unchanged / not_found / skipped
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import User
+
+
+# 续期后的到期时间：会员有效时在原到期时间上加，已过期或不是会员则从现在算起。
+# 永久会员（到期时间为空）不需要续期，返回 None
+def premium_end(is_premium: bool, end_at: datetime | None, days: int, now: datetime) -> datetime | None:
+    if is_premium and end_at is None:
+        return None
+    if is_premium and end_at >= now:
+        return end_at + timedelta(days=days)
+    return now + timedelta(days=days)
+
+
+# ids 最多 MAX_BULK_IDS 个，在 Python 里算好每个用户的新到期时间，再用一条按 id 取值的 UPDATE 写回
+async def extend_premium(session: AsyncSession, ids: List[int], days: int, dry_run: bool) -> List[dict]:
+    now = datetime.now()
+    rows = (await session.execute(select(User.id, User.is_premium, User.premium_end_at).where(User.id.in_(ids)))).all()
+    found = {row.id: premium_end(row.is_premium, row.premium_end_at, days, now) for row in rows}
+    updated = {user_id: end_at for user_id, end_at in found.items() if end_at is not None}
+    if not dry_run and updated:
+        await session.execute(
+            update(User)
+            .where(User.id.in_(updated))
+            .values(is_premium=True, premium_end_at=case(updated, value=User.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    def outcome(user_id: int) -> dict:
+        if user_id not in found:
+            return {"id": user_id, "status": "not_found"}
+        if user_id not in updated:
+            return {"id": user_id, "status": "unchanged"}
+        return {"id": user_id, "status": "updated", "premium_end_at": updated[user_id]}
+
+    return [outcome(user_id) for user_id in ids]
+
+
+# protect_id（当前管理员自己）不参与修改，避免批量撤销时把自己也撤掉
+async def set_superuser(session: AsyncSession, ids: List[int], value: bool, dry_run: bool, protect_id: int | None = None) -> List[dict]:
+    current = dict((await session.execute(select(User.id, User.is_superuser).where(User.id.in_(ids)))).all())
+    updated = {user_id for user_id, is_superuser in current.items() if is_superuser != value and user_id != protect_id}
+    if not dry_run and updated:
+        result = await session.execute(
+            update(User)
+            .where(User.id.in_(updated))
+            .values(is_superuser=value)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(result.scalars().all())
+
+    def status(user_id: int) -> str:
+        if user_id not in current:
+            return "not_found"
+        if user_id == protect_id:
+            return "skipped"
+        return "updated" if user_id in updated else "unchanged"
+
+    return [{"id": user_id, "status": status(user_id)} for user_id in ids]
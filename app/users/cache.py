@@ -0,0 +1,59 @@
+from sqlalchemy import inspect
+
+from app.bus import bus
+from app.cache import TTLCache
+from app.db.models import User
+from config import settings
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+# 按用户 id 缓存已认证用户，避免每个请求解析 JWT 后都查一次 user 表。
+# 缓存的是列值快照，每次取出都构造新的 User 对象，请求之间互不影响。
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        # 每次失效都递增，读库前后不一致时不写入缓存，防止把失效前读到的旧数据放回去
+        self._generation = 0
+
+    def begin(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int) -> User | None:
+        values = self._cache.get(user_id)
+        return User(**values) if values is not None else None
+
+    def set(self, user: User, token: int) -> None:
+        if token != self._generation:
+            return
+        self._cache.set(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+    # 失效同时广播给其他 worker，它们各自的缓存里也可能有这个用户
+    def invalidate(self, user_id: int) -> None:
+        self.invalidate_many([user_id])
+
+    def invalidate_many(self, user_ids) -> None:
+        user_ids = list(user_ids)
+        self._evict(user_ids)
+        bus.publish("users.invalidate", user_ids)
+
+    def clear(self) -> None:
+        self._clear_local()
+        bus.publish("users.clear")
+
+    def _evict(self, user_ids) -> None:
+        self._generation += 1
+        for user_id in user_ids:
+            self._cache.pop(user_id)
+
+    def _clear_local(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+bus.register("users.invalidate", user_cache._evict)
+bus.register("users.clear", user_cache._clear_local)
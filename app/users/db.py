@@ -1,8 +1,70 @@
 from fastapi import Depends
+from fastapi_users import exceptions
 from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_async_session  
-from app.db.models import User
+from app.db.session import get_async_session, get_read_session
+from app.db.models import Comment, User
+from app.users.cache import user_cache
+from app.users.deletion import prepare_user_delete, tombstone_user
+from app.comments import events
+from config import settings
+
+
+# 按 id 取用户时先查缓存；修改、删除前重新从本会话加载，写完后让缓存失效
+class CachedUserDatabase(SQLAlchemyUserDatabase[User, int]):
+    async def get(self, id: int) -> User | None:
+        user = user_cache.get(id)
+        if user is not None:
+            return user
+        token = user_cache.begin()
+        user = await super().get(id)
+        if user is not None:
+            user_cache.set(user, token)
+        return user
+
+    async def update(self, user: User, update_dict: dict) -> User:
+        user = await self._attach(user)
+        renamed = "username" in update_dict and update_dict["username"] != user.username
+        try:
+            user = await super().update(user, update_dict)
+        finally:
+            user_cache.invalidate(user.id)
+        # 评论页缓存里嵌着用户名，改名后按 ix_comment_user_id_id 找出评论过的文章逐个失效
+        if renamed:
+            article_ids = await self.session.scalars(select(Comment.article_id).where(Comment.user_id == user.id).distinct())
+            events.user_renamed(article_ids.all())
+        return user
+
+    # 点赞计数先撤回，评论与点赞交给数据库级联删除；软删除模式下只停用并打墓碑
+    async def delete(self, user: User) -> None:
+        user = await self._attach(user)
+        try:
+            if settings.SOFT_DELETE_ENABLED:
+                article_ids = await tombstone_user(self.session, user)
+                await self.session.commit()
+            else:
+                article_ids = await prepare_user_delete(self.session, user.id)
+                await super().delete(user)
+        finally:
+            user_cache.invalidate(user.id)
+        for article_id in article_ids:
+            events.comment_deleted(article_id)
+
+    # 缓存里取出的是游离对象，不能直接 add 进会话，否则会被当成新用户插入
+    async def _attach(self, user: User) -> User:
+        if not inspect(user).transient:
+            return user
+        persistent = await self.session.get(User, user.id)
+        if persistent is None:
+            raise exceptions.UserNotExists()
+        return persistent
+
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
+
+
+# 只读接口用：缓存未命中时从只读连接加载用户，不占用写连接
+async def get_read_user_db(session: AsyncSession = Depends(get_read_session)):
+    yield CachedUserDatabase(session, User)
@@ -0,0 +1,54 @@
+# 用户删除：撤回点赞计数后交给数据库级联删除；软删除时先停用并打墓碑，由 purge_loop 分批清理
+from datetime import datetime
+
+from sqlalchemy import delete, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Comment, User
+from app.likes.counters import release_user_likes
+
+
+# 用户评论过的文章，删除后这些文章的评论缓存需要失效
+async def commented_articles(session: AsyncSession, user_id: int) -> list[str]:
+    result = await session.execute(select(Comment.article_id).where(Comment.user_id == user_id).distinct())
+    return list(result.scalars().all())
+
+
+# 在调用方提交前执行：撤回点赞并返回受影响的文章，用户行本身由调用方删除
+async def prepare_user_delete(session: AsyncSession, user_id: int) -> list[str]:
+    article_ids = set(await release_user_likes(session, user_id))
+    article_ids.update(await commented_articles(session, user_id))
+    return list(article_ids)
+
+
+async def tombstone_user(session: AsyncSession, user: User) -> list[str]:
+    user.deleted_at = datetime.now()
+    user.is_active = False
+    return await commented_articles(session, user.id)
+
+
+# 分批清理一个已软删除的用户：先删评论（叶子优先），再撤回点赞，都删完后删用户行
+async def purge_user(session: AsyncSession, user_id: int, batch_size: int) -> list[str]:
+    batch = (
+        select(Comment.id)
+        .where(Comment.user_id == user_id)
+        .order_by(desc(Comment.id))
+        .limit(batch_size)
+    )
+    result = await session.execute(
+        delete(Comment)
+        .where(Comment.id.in_(batch.scalar_subquery()))
+        .returning(Comment.article_id)
+        .execution_options(synchronize_session=False)
+    )
+    article_ids = set(result.scalars().all())
+    if article_ids:
+        return list(article_ids)
+
+    article_ids = await release_user_likes(session, user_id, batch_size)
+    if article_ids:
+        return article_ids
+
+    await session.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    return []
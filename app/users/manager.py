@@ -1,6 +1,7 @@
 from typing import Optional
 from fastapi import Depends, Request, HTTPException, Response
-from fastapi_users import BaseUserManager, FastAPIUsers, models, IntegerIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, models, schemas, exceptions, IntegerIDMixin
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
@@ -10,10 +11,9 @@ from fastapi_users.authentication import (
 from fastapi_users.db import SQLAlchemyUserDatabase
 
 from config import settings
-from app.users.db import User, get_user_db  # 你的用户模型和依赖
+from app.users.db import User, get_read_user_db, get_user_db  # 你的用户模型和依赖
+from app.users.passwords import password_helper, password_pool
 from datetime import datetime, timezone
-from app.db.session import get_async_session
-from sqlalchemy.ext.asyncio import AsyncSession
 from config import SECRET  # 推荐放到 config 文件中管理密钥
 
 # 🔒 自定义用户管理器，主键类型为 int（不是 UUID！）
@@ -30,18 +30,71 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def on_after_request_verify(self, user: User, token: str, request: Optional[Request] = None):
         print(f"Verification requested for user {user.id}. Token: {token}")
 
+    # 以下三个方法与 BaseUserManager 的实现相同，只是把密码哈希 / 校验交给 password_pool，不在事件循环里计算
+    async def create(self, user_create: schemas.UC, safe: bool = False, request: Optional[Request] = None) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        password = user_dict.pop("password")
+        await self._release_connection()
+        user_dict["hashed_password"] = await password_pool.hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # 用户不存在时也算一次哈希，防止通过耗时差异探测邮箱是否注册
+            await self._release_connection()
+            await password_pool.hash(credentials.password)
+            return None
+
+        await self._release_connection()
+        verified, updated_password_hash = await password_pool.verify_and_update(credentials.password, user.hashed_password)
+        if not verified:
+            return None
+        # 哈希参数变了就顺便按新参数重新哈希
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    # 哈希要几百毫秒，先结束查询开启的只读事务，把（唯一的）写连接还回连接池，
+    # 之后的写入会重新取连接；expire_on_commit=False，已加载的 user 不会过期
+    async def _release_connection(self) -> None:
+        await self.user_db.session.commit()
+
+    async def _update(self, user: User, update_dict: dict) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {key: value for key, value in update_dict.items() if key != "password"}
+            await self._release_connection()
+            update_dict["hashed_password"] = await password_pool.hash(password)
+        return await super()._update(user, update_dict)
+
     # 检查会员到期
     async def on_after_login(
             self, user: User, request: Request | None = None, response: Response | None = None,
             ):
-        session: AsyncSession = await get_async_session().__anext__()
-        if user.is_premium and user.premium_end_at and user.premium_end_at < datetime.now():
-            user.is_premium = False
-            await session.commit()
+        # 后台任务会定时批量清理，这里只在确实到期时顺手更新，不额外开会话
+        if user.is_premium and not is_premium_active(user):
+            await self.user_db.update(user, {"is_premium": False})
 
 # 👉 依赖注入，FastAPI 用它来获取用户管理器
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
+
+
+# 只读接口用的用户管理器，只用来从 token 解析当前用户
+async def get_read_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_read_user_db)):
+    yield UserManager(user_db, password_helper)
 
 
 
@@ -88,9 +141,19 @@ current_active_user = fastapi_users.current_user(active=True)
 current_active_user_optional = fastapi_users.current_user(active=True, optional=True)
 current_super_user = fastapi_users.current_user(superuser=True)
 
+# 非 GET 的只读接口（如 POST /likes/state）：解析用户与接口本身共用同一个只读会话
+read_fastapi_users = FastAPIUsers[User, int](get_read_user_manager, [auth_backend_bearer, auth_backend_cookie])
+current_active_user_optional_read = read_fastapi_users.current_user(active=True, optional=True)
+
 # 自定义验证身份依赖
 
-async def get_premium_user(user: User =Depends(current_active_user)):
+# 会员是否有效：is_premium 可能还没被后台任务更新，所以同时检查到期时间
+def is_premium_active(user: User) -> bool:
     if not user.is_premium:
+        return False
+    return user.premium_end_at is None or user.premium_end_at >= datetime.now()
+
+async def get_premium_user(user: User =Depends(current_active_user)):
+    if not is_premium_active(user):
         raise HTTPException(status_code=403, detail="您还不是会员，请联系管理员升级会员")
     return user
@@ -0,0 +1,66 @@
+# 密码哈希 / 校验放到有界线程池里执行，不阻塞事件循环。
+# argon2-cffi 与 bcrypt 计算时都会释放 GIL，线程池即可并行，不需要进程池
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from app.metrics import password_hash_seconds
+from config import settings
+
+
+class PasswordPool:
+    def __init__(self, helper: PasswordHelper, workers: int, queue_size: int):
+        self.helper = helper
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        # 正在计算与排队的总数上限，超过直接拒绝，避免登录洪峰堆积成超时
+        self._limit = workers + queue_size
+        self._pending = 0
+        self.rejected = 0
+
+    async def _run(self, op: str, fn, *args):
+        if self._pending >= self._limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="登录请求过多，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            password_hash_seconds[op].observe(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.helper.hash, password)
+
+    # 哈希参数变化（或旧的 bcrypt 哈希）时第二个返回值是新哈希，由调用方写回
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run("verify", self.helper.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"pending": self._pending, "limit": self._limit, "rejected": self.rejected}
+
+
+# 新密码用 argon2（参数可配置），旧的 bcrypt 哈希在登录时自动升级
+password_helper = PasswordHelper(PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+    BcryptHasher(),
+)))
+
+password_pool = PasswordPool(password_helper, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
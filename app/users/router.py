@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import User
+from app.db.pagination import MAX_PAGE_SIZE
+from app.db.session import get_async_session
+from app.users import activity
 from app.users.manager import auth_backend_bearer, auth_backend_cookie, current_active_user, fastapi_users, current_super_user
-from app.users.schemas import UserCreate, UserRead, UserUpdate
+from app.users.schemas import UserActivity, UserCreate, UserRead, UserUpdate
 
 
 
@@ -49,3 +53,29 @@ router.include_router(
 async def authenticated_route(user: User = Depends(current_active_user)):
     return {"message": f"Hello {user.email}!"}
 
+
+# 用户主页：统计数 + 最近的评论与点赞，已注销的用户返回 404
+@router.get("/users/{user_id}/activity", response_model=UserActivity, tags=["users"])
+async def user_activity(
+    user_id: int,
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每页动态数量"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        after = activity.decode_cursor(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+    user = await session.get(User, user_id)
+    if user is None or user.deleted_at is not None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户未找到")
+
+    items, next_cursor = await activity.load_activity(session, user_id, after, limit)
+    return UserActivity(
+        user_id=user.id,
+        username=user.username,
+        stats=await activity.load_stats(session, user_id),
+        items=items,
+        next_cursor=next_cursor,
+    )
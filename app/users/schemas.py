@@ -1,6 +1,9 @@
 from datetime import datetime
 from fastapi_users import schemas
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+from app.db.pagination import MAX_BULK_IDS
 
 class UserRead(schemas.BaseUser[int]):
     username: str
@@ -18,9 +21,62 @@ class UserUpdate(schemas.BaseUserUpdate):
     username: str | None = None
 
 
+class UserPage(BaseModel):
+    items: List[UserRead]
+    next_cursor: int | None = None  # 为空表示没有下一页
+    total: int  # 满足过滤条件的总数，可能有 ADMIN_COUNT_TTL 秒的延迟
+
+
+class UserStatsRead(BaseModel):
+    comment_count: int
+    likes_given: int
+    likes_received: int
+
+
+# 评论动态带内容与点赞数；点赞动态的 comment_id 是被赞的评论
+class ActivityItem(BaseModel):
+    kind: Literal["comment", "like"]
+    id: int
+    article_id: str
+    comment_id: int
+    parent_id: int | None = None
+    content: str | None = None
+    like_count: int | None = None
+    created_at: datetime
+
+
+class UserActivity(BaseModel):
+    user_id: int
+    username: str
+    stats: UserStatsRead
+    items: List[ActivityItem]
+    next_cursor: str | None = None  # 为空表示没有下一页
+
+
 class UserId(BaseModel):
     id: int
 
 class UserCharge(BaseModel):
     id: int
-    days: int
\ No newline at end of file
+    days: int
+
+
+# 批量操作：dry_run 时只返回预期结果，不做修改
+class BulkUserIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    dry_run: bool = False
+
+
+class BulkPremium(BulkUserIds):
+    days: int = Field(..., gt=0)
+
+
+class BulkUserOutcome(BaseModel):
+    id: int
+    status: Literal["updated", "unchanged", "not_found", "skipped"]
+    premium_end_at: datetime | None = None  # 仅续期会员时返回
+
+
+class BulkUserResult(BaseModel):
+    dry_run: bool
+    items: List[BulkUserOutcome]  # 与请求中 ids 的顺序一致（已去重）
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+from app.comments import events
+from app.comments.deletion import purge_comments
+from app.users.deletion import purge_user
+from app.db.session import async_session_maker
+from app.users.cache import user_cache
+from app.bus import bus
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 一条 UPDATE 取消所有已到期会员，返回受影响的用户 id
+async def expire_premiums(session: AsyncSession) -> list[int]:
+    result = await session.execute(
+        update(User)
+        .where(User.is_premium == True, User.premium_end_at < datetime.now())  # noqa: E712
+        .values(is_premium=False)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
+
+
+# 后台定时清理到期会员，由 app.main 的 lifespan 启动
+async def premium_expiry_loop(interval: float) -> None:
+    while True:
+        try:
+            async with async_session_maker() as session:
+                expired = await expire_premiums(session)
+                await session.commit()
+            if expired:
+                user_cache.invalidate_many(expired)
+                logger.info("已取消 %d 个到期会员", len(expired))
+        except Exception:
+            logger.exception("清理到期会员失败")
+        await asyncio.sleep(interval)
+
+
+# 清理一批软删除的数据，每批单独提交，尽快释放写锁；没有可清理的数据时返回 False
+async def purge_batch(batch_size: int) -> bool:
+    async with async_session_maker() as session:
+        article_ids = await purge_comments(session, batch_size)
+        user_id = None
+        if not article_ids:
+            user_id = await session.scalar(select(User.id).where(User.deleted_at.is_not(None)).limit(1))
+            if user_id is None:
+                return False
+            article_ids = await purge_user(session, user_id, batch_size)
+        await session.commit()
+    if user_id is not None:
+        user_cache.invalidate(user_id)
+    for article_id in article_ids:
+        events.comments_purged(article_id)
+    return True
+
+
+# 后台分批清理软删除的评论与用户，由 app.main 的 lifespan 启动
+async def purge_loop(interval: float, batch_size: int) -> None:
+    while True:
+        try:
+            batches = 0
+            while await purge_batch(batch_size):
+                batches += 1
+            if batches:
+                logger.info("已清理 %d 批软删除数据", batches)
+        except Exception:
+            logger.exception("清理软删除数据失败")
+        await asyncio.sleep(interval)
+
+
+# 多 worker 时只有持有 leader 锁的 worker 跑定时清理。没拿到锁的定期重试：
+# leader 退出（SIGTTOU 缩容、崩溃）后锁被释放，由存活的 worker 接手，而不是等下一次重启
+async def leader_loop(retry_interval: float) -> None:
+    loops = []
+    if settings.PREMIUM_SWEEP_INTERVAL > 0:
+        loops.append(premium_expiry_loop(settings.PREMIUM_SWEEP_INTERVAL))
+    if settings.PURGE_INTERVAL > 0:
+        loops.append(purge_loop(settings.PURGE_INTERVAL, settings.PURGE_BATCH_SIZE))
+    if not loops:
+        return
+    try:
+        while not bus.try_leader():
+            await asyncio.sleep(retry_interval)
+        logger.info("取得 leader 锁，开始运行定时清理")
+        await asyncio.gather(*loops)
+    finally:
+        # 还没拿到锁就被取消时协程从未运行，关闭它们，避免退出时报 never awaited
+        for loop in loops:
+            loop.close()
@@ -0,0 +1,116 @@
+# 评论树序列化基准：对比旧的“递归构造 CommentRead + response_model 校验 + json.dumps”
+# 与新的“非递归构造 dict + 一次性序列化”。
+#
+#   python -m benchmarks.bench_comment_tree --roots 500 --replies 10
+import argparse
+import json
+import sys
+import timeit
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.comments.schemas import CommentRead
+from app.comments.tree import build_nodes
+from app.responses import dumps
+
+
+def make_comments(roots: int, replies: int) -> list:
+    start = datetime(2025, 1, 1)
+    comments = []
+    next_id = 1
+    for _ in range(roots):
+        root_id = next_id
+        user = SimpleNamespace(username=f"user{root_id % 97}")
+        comments.append(SimpleNamespace(
+            id=root_id, content="评论内容" * 10, article_id="A", user_id=root_id % 97, parent_id=None,
+            created_at=start + timedelta(seconds=root_id), user=user, like_count=root_id % 13,
+        ))
+        next_id += 1
+        for _ in range(replies):
+            comments.append(SimpleNamespace(
+                id=next_id, content="回复内容" * 5, article_id="A", user_id=next_id % 97, parent_id=root_id,
+                created_at=start + timedelta(seconds=next_id), user=user, like_count=next_id % 5,
+            ))
+            next_id += 1
+    comments.sort(key=lambda c: c.id, reverse=True)
+    return comments
+
+
+# 旧实现：递归构造 Pydantic 模型，再由 FastAPI 按 response_model 校验、转成 JSON 兼容对象并 json.dumps
+def old_path(comments: list) -> bytes:
+    comment_map = defaultdict(list)
+    for comment in comments:
+        comment_map[comment.parent_id].append(comment)
+
+    def build_comment_tree(comment) -> CommentRead:
+        return CommentRead(
+            id=comment.id,
+            content=comment.content,
+            article_id=comment.article_id,
+            user_id=comment.user_id,
+            parent_id=comment.parent_id,
+            created_at=comment.created_at,
+            username=comment.user.username if comment.user else None,
+            liked=False,
+            like_count=comment.like_count,
+            replies=[build_comment_tree(child) for child in comment_map.get(comment.id, [])]
+        )
+
+    content = [build_comment_tree(c) for c in comment_map[None]]
+    validated = OLD_ADAPTER.validate_python(content)
+    jsonable = OLD_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def new_path(comments: list) -> bytes:
+    roots = [c for c in comments if c.parent_id is None]
+    replies = [c for c in comments if c.parent_id is not None]
+    reply_counts = defaultdict(int)
+    for reply in replies:
+        reply_counts[reply.parent_id] += 1
+    return dumps(build_nodes(roots, replies, reply_counts))
+
+
+OLD_ADAPTER = TypeAdapter(List[CommentRead])
+
+
+def strip_reply_count(nodes: list) -> list:
+    return [
+        {**{k: v for k, v in node.items() if k != "reply_count"}, "replies": strip_reply_count(node["replies"])}
+        for node in nodes
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roots", type=int, default=500)
+    parser.add_argument("--replies", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    comments = make_comments(args.roots, args.replies)
+    # 两种实现的输出必须等价（旧实现没有 reply_count）
+    assert strip_reply_count(json.loads(old_path(comments))) == strip_reply_count(json.loads(new_path(comments))), "输出不一致"
+
+    results = {}
+    for name, func in (("old", old_path), ("new", new_path)):
+        timings = timeit.repeat(lambda: func(comments), repeat=args.repeat, number=args.number)
+        results[name] = min(timings) / args.number * 1000
+
+    json.dump({
+        "benchmark": "comment_tree",
+        "comments": len(comments),
+        "old_ms": round(results["old"], 3),
+        "new_ms": round(results["new"], 3),
+        "speedup": round(results["old"] / results["new"], 2),
+    }, sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# 进程内压测：通过 ASGI transport 直接驱动 app.main:app，不经过网络
+#
+#   python -m benchmarks.seed --database ./bench.db
+#   python -m benchmarks.load --database ./bench.db --requests 2000 --concurrency 32 --output result.json
+#
+# 输出每个场景的吞吐量与 p50/p95/p99 延迟（JSON），便于不同版本之间对比。
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Awaitable, Callable
+
+SCENARIOS = ("by_article", "by_article_hot", "by_article_auth", "likes", "login", "admin_users", "admin_comments")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+
+    async def timed(self, request: Awaitable) -> None:
+        started = time.perf_counter()
+        response = await request
+        self.latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors += 1
+
+    def summary(self, seconds: float) -> dict:
+        samples = sorted(self.latencies)
+        return {
+            "requests": len(samples),
+            "errors": self.errors,
+            "seconds": round(seconds, 3),
+            "throughput_rps": round(len(samples) / seconds, 1) if seconds else 0.0,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        }
+
+
+async def run_scenario(operation: Callable[[random.Random, Recorder], Awaitable[None]], requests: int, concurrency: int, seed: int) -> dict:
+    recorder = Recorder()
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in remaining:
+            await operation(rng, recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    import httpx
+    from app.main import app
+    from benchmarks.seed import PASSWORD
+
+    con = sqlite3.connect(args.database)
+    articles = [row[0] for row in con.execute("SELECT article_id FROM comment GROUP BY article_id ORDER BY count(*) DESC")]
+    max_comment_id = con.execute("SELECT max(id) FROM comment").fetchone()[0]
+    user_count = con.execute("SELECT count(*) FROM user").fetchone()[0]
+    con.close()
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def login(user_id: int) -> dict:
+                response = await client.post("/auth/jwt/login", data={"username": f"user{user_id}@example.com", "password": PASSWORD})
+                response.raise_for_status()
+                return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            admin = await login(1)
+            # 1 号是管理员，普通用户从 2 号开始，最多取到库里已有的最后一个用户
+            tokens = [await login(user_id) for user_id in range(2, min(user_count, args.users + 1) + 1)]
+
+            def pick_article(rng: random.Random) -> str:
+                # 热门文章占大部分流量
+                return articles[min(int(len(articles) * rng.random() ** 3), len(articles) - 1)]
+
+            async def by_article(rng, recorder):
+                await recorder.timed(client.get(f"/comments/by_article/{pick_article(rng)}"))
+
+            async def by_article_hot(rng, recorder):
+                await recorder.timed(client.get(f"/comments/by_article/{pick_article(rng)}", params={"sort": "hot"}))
+
+            async def by_article_auth(rng, recorder):
+                await recorder.timed(client.get(f"/comments/by_article/{pick_article(rng)}", headers=rng.choice(tokens)))
+
+            async def likes(rng, recorder):
+                headers = rng.choice(tokens)
+                comment_id = rng.randint(1, max_comment_id)
+                await recorder.timed(client.post("/likes", json={"comment_id": comment_id}, headers=headers))
+                await recorder.timed(client.delete(f"/likes/{comment_id}", headers=headers))
+
+            async def login_op(rng, recorder):
+                user_id = rng.randint(1, user_count)
+                await recorder.timed(client.post("/auth/jwt/login", data={"username": f"user{user_id}@example.com", "password": PASSWORD}))
+
+            async def admin_users(rng, recorder):
+                await recorder.timed(client.get("/admin/list-users", params={"cursor": rng.randint(2, user_count + 1)}, headers=admin))
+
+            async def admin_comments(rng, recorder):
+                await recorder.timed(client.get("/comments/all", params={"cursor": rng.randint(2, max_comment_id + 1)}, headers=admin))
+
+            operations = {
+                "by_article": by_article,
+                "by_article_hot": by_article_hot,
+                "by_article_auth": by_article_auth,
+                "likes": likes,
+                "login": login_op,
+                "admin_users": admin_users,
+                "admin_comments": admin_comments,
+            }
+            for name in args.scenarios:
+                # 登录要做密码哈希，单独用较少的请求数
+                requests = args.login_requests if name == "login" else args.requests
+                results[name] = await run_scenario(operations[name], requests, args.concurrency, args.seed)
+
+    return {
+        "database": args.database,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database", default="./bench.db", help="benchmarks.seed 生成的 SQLite 文件")
+    parser.add_argument("--requests", type=int, default=1000, help="每个场景的请求数")
+    parser.add_argument("--login-requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50, help="参与压测的登录用户数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="结果写入该文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    # 配置在导入 app 时读取，必须先设置数据库地址
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{args.database}"
+    # 进程内压测所有请求来自同一个 IP，默认关闭写接口限流，测的是写入本身
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    result = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
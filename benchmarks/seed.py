@@ -0,0 +1,147 @@
+# 生成压测用的合成数据：用户、多层评论树、长尾分布的点赞
+#
+#   python -m benchmarks.seed --database ./bench.db --users 10000 --comments 1000000 --likes 3000000
+#
+# 所有用户的密码都是 PASSWORD，1 号用户是管理员。相同的 --seed 生成完全相同的数据。
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+PASSWORD = "password"
+CHUNK = 50000
+# 与 ORM 写入 DateTime 列的格式一致（带 6 位小数秒），时间列按字符串比较时才有正确的顺序
+TIMESTAMP = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def create_schema(path: str) -> None:
+    from app.db.models import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+def zipf_index(rng: random.Random, n: int, skew: float) -> int:
+    # 近似 Zipf：少数热门对象占据大部分流量
+    return min(int(n * rng.random() ** skew), n - 1)
+
+
+def seed(args: argparse.Namespace) -> dict:
+    from pwdlib import PasswordHash
+
+    rng = random.Random(args.seed)
+    create_schema(args.database)
+    con = sqlite3.connect(args.database)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=OFF")
+    started = time.perf_counter()
+    base_time = datetime(2025, 1, 1)
+
+    # 哈希只算一次，所有用户共用
+    hashed_password = PasswordHash.recommended().hash(PASSWORD)
+    con.executemany(
+        "INSERT INTO user (id, email, hashed_password, is_active, is_superuser, is_verified, username, is_premium, premium_end_at) "
+        "VALUES (?, ?, ?, 1, ?, 1, ?, ?, ?)",
+        (
+            (
+                i, f"user{i}@example.com", hashed_password, int(i == 1), f"user{i}",
+                int(i % 10 == 0), (base_time + timedelta(days=365)).strftime(TIMESTAMP) if i % 10 == 0 else None,
+            )
+            for i in range(1, args.users + 1)
+        ),
+    )
+
+    # 评论：文章热度长尾分布；每条评论以 reply_ratio 的概率回复同一篇文章里较新的评论，形成多层树
+    article_comments: dict[int, list[tuple[int, int]]] = {}
+    like_counts = [0] * (args.comments + 1)
+
+    def comment_rows():
+        for comment_id in range(1, args.comments + 1):
+            article = zipf_index(rng, args.articles, args.skew)
+            siblings = article_comments.setdefault(article, [])
+            parent_id, depth = None, 0
+            if siblings and rng.random() < args.reply_ratio:
+                # 偏向最近的评论，回复链会越来越深
+                parent_id, parent_depth = siblings[-1 - zipf_index(rng, min(len(siblings), 50), 2.0)]
+                if parent_depth + 1 <= args.max_depth:
+                    depth = parent_depth + 1
+                else:
+                    parent_id = None
+            siblings.append((comment_id, depth))
+            yield (
+                comment_id, f"article-{article}", f"合成评论 {comment_id} " + "内容" * rng.randint(1, 40),
+                rng.randint(1, args.users), parent_id, (base_time + timedelta(seconds=comment_id)).strftime(TIMESTAMP),
+            )
+
+    rows = comment_rows()
+    while True:
+        chunk = [row for _, row in zip(range(CHUNK), rows)]
+        if not chunk:
+            break
+        con.executemany(
+            "INSERT INTO comment (id, article_id, content, user_id, parent_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            chunk,
+        )
+
+    # 点赞：评论与用户都是长尾分布，(评论, 用户) 去重
+    seen = set()
+    like_rows = []
+    attempts = 0
+    while len(seen) < args.likes and attempts < args.likes * 3:
+        attempts += 1
+        key = (args.comments - zipf_index(rng, args.comments, args.skew), zipf_index(rng, args.users, 1.5) + 1)
+        if key in seen:
+            continue
+        seen.add(key)
+        like_counts[key[0]] += 1
+        like_rows.append((key[0], key[1], (base_time + timedelta(seconds=key[0] + rng.randint(1, 86400))).strftime(TIMESTAMP)))
+        if len(like_rows) >= CHUNK:
+            con.executemany("INSERT INTO comment_like (comment_id, user_id, created_at) VALUES (?, ?, ?)", like_rows)
+            like_rows.clear()
+    if like_rows:
+        con.executemany("INSERT INTO comment_like (comment_id, user_id, created_at) VALUES (?, ?, ?)", like_rows)
+
+    con.executemany(
+        "UPDATE comment SET like_count = ? WHERE id = ?",
+        ((count, comment_id) for comment_id, count in enumerate(like_counts) if count),
+    )
+    con.commit()
+    con.execute("ANALYZE")
+    con.close()
+
+    return {
+        "database": args.database,
+        "seed": args.seed,
+        "users": args.users,
+        "articles": len(article_comments),
+        "comments": args.comments,
+        "likes": len(seen),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database", default="./bench.db", help="SQLite 文件路径，必须是新文件")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--likes", type=int, default=60000)
+    parser.add_argument("--reply-ratio", type=float, default=0.6, help="评论是回复的概率")
+    parser.add_argument("--max-depth", type=int, default=30, help="回复链最大深度")
+    parser.add_argument("--skew", type=float, default=3.0, help="热度偏斜程度，越大越集中")
+    args = parser.parse_args()
+
+    json.dump(seed(args), sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
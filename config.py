@@ -12,6 +12,66 @@ class Settings:
     COOKIE_DOMAIN: str = os.getenv("DOMAIN", "localhost:5173")
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     ROOT: str = os.getenv("ROOT", "")
+    # 生产启动（python main.py）：监听地址、worker 进程数、优雅关闭等待秒数
+    BIND_HOST: str = os.getenv("BIND_HOST", "127.0.0.1")
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    GRACEFUL_TIMEOUT: float = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    # worker 之间的缓存失效总线所用目录（Unix 套接字），为空表示不启用；多 worker 启动时自动创建
+    BUS_DIR: str = os.getenv("BUS_DIR", "")
+    # 没拿到 leader 锁的 worker 每隔多少秒重试一次，leader 退出后由存活的 worker 接手定时清理
+    LEADER_RETRY_INTERVAL: float = float(os.getenv("LEADER_RETRY_INTERVAL", "5"))
+    # 请求 / SQL 埋点与 /metrics；单个请求的 SQL 条数超过阈值时记录疑似 N+1 的警告
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "15"))
+    # 超过该字节数的响应做 gzip 压缩，0 表示关闭
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "4096"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "5"))
+    # 数据库与 SQLite 调优参数
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # 毫秒
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # 负数表示 KiB，即 64MB
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "4"))  # 0 表示读写共用写连接
+    # 同时进行的管理员导出数，导出各自开只读连接，不占用读连接池；超出时返回 503
+    EXPORT_MAX_CONCURRENT: int = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+    # 评论树缓存：缓存的文章数量与过期秒数，任一为 0 则关闭
+    COMMENT_CACHE_SIZE: int = int(os.getenv("COMMENT_CACHE_SIZE", "1024"))
+    COMMENT_CACHE_TTL: float = float(os.getenv("COMMENT_CACHE_TTL", "60"))
+    # 评论实时推送（SSE）：每个订阅者的队列长度（满了即断开）、保活间隔（秒）、全进程订阅上限
+    LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+    LIVE_HEARTBEAT: float = float(os.getenv("LIVE_HEARTBEAT", "15"))
+    LIVE_MAX_SUBSCRIBERS: int = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "10000"))
+    # 已认证用户缓存
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))
+    # 密码哈希线程池：线程数与排队上限，排满后登录 / 注册返回 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_QUEUE: int = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+    # argon2 参数，修改后旧密码在下次登录时自动按新参数重新哈希
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    # 到期会员清理间隔（秒），0 表示不启动后台任务
+    PREMIUM_SWEEP_INTERVAL: float = float(os.getenv("PREMIUM_SWEEP_INTERVAL", "300"))
+    # 管理后台列表总数的缓存秒数
+    ADMIN_COUNT_TTL: float = float(os.getenv("ADMIN_COUNT_TTL", "30"))
+    # 软删除：删除评论/用户时先标记墓碑，由后台任务每隔 PURGE_INTERVAL 秒分批（PURGE_BATCH_SIZE 行）真正删除
+    SOFT_DELETE_ENABLED: bool = os.getenv("SOFT_DELETE_ENABLED", "false").lower() == "true"
+    PURGE_INTERVAL: float = float(os.getenv("PURGE_INTERVAL", "60"))
+    PURGE_BATCH_SIZE: int = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+    # 写接口限流（令牌桶）："次数/秒数"，按用户与 IP 计；会员额度乘以 PREMIUM_FACTOR，IP 额度乘以 IP_FACTOR
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_COMMENTS: str = os.getenv("RATE_LIMIT_COMMENTS", "10/60")
+    RATE_LIMIT_LIKES: str = os.getenv("RATE_LIMIT_LIKES", "60/60")
+    RATE_LIMIT_PREMIUM_FACTOR: float = float(os.getenv("RATE_LIMIT_PREMIUM_FACTOR", "3"))
+    RATE_LIMIT_IP_FACTOR: float = float(os.getenv("RATE_LIMIT_IP_FACTOR", "5"))
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    # 点赞写回缓冲：开启后点赞先进内存，凑满 FLUSH_SIZE 条或每隔 FLUSH_INTERVAL 秒批量写库
+    LIKE_BUFFER_ENABLED: bool = os.getenv("LIKE_BUFFER_ENABLED", "false").lower() == "true"
+    LIKE_BUFFER_FLUSH_SIZE: int = int(os.getenv("LIKE_BUFFER_FLUSH_SIZE", "500"))
+    LIKE_BUFFER_FLUSH_INTERVAL: float = float(os.getenv("LIKE_BUFFER_FLUSH_INTERVAL", "0.5"))
 
 settings = Settings()
 
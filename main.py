@@ -1,5 +1,40 @@
+import argparse
+import os
+import shutil
+import tempfile
+
 import uvicorn
 from config import settings
 
+
+# 生产启动入口。workers > 1 时由 uvicorn 的主进程管理子进程：
+# SIGHUP 逐个优雅重启 worker，SIGTTIN / SIGTTOU 增减 worker，SIGTERM 等待进行中的请求结束后退出
+def main():
+    parser = argparse.ArgumentParser(description="启动 vocabili-user-backend")
+    parser.add_argument("--host", default=settings.BIND_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=int(settings.PORT), help="监听端口")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="worker 进程数")
+    args = parser.parse_args()
+
+    # worker 是 spawn 出来的新进程，通过环境变量拿到同一个失效总线目录
+    bus_dir = None
+    if args.workers > 1 and not settings.BUS_DIR:
+        bus_dir = tempfile.mkdtemp(prefix="vocabili-bus-")
+        os.environ["BUS_DIR"] = bus_dir
+
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+            log_level="info",
+        )
+    finally:
+        if bus_dir is not None:
+            shutil.rmtree(bus_dir, ignore_errors=True)
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host=settings.API_HOST, port=int(settings.PORT), log_level="info")
\ No newline at end of file
+    main()
@@ -0,0 +1,61 @@
+# 测试用独立的临时 SQLite 库；配置在导入 app 时读取，必须先设置环境变量
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="vocabili-test-")
+DB_PATH = os.path.join(_db_dir, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.db.models import Base
+
+
+@pytest.fixture
+def db():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    connection = sqlite3.connect(DB_PATH)
+    yield connection
+    connection.close()
+
+
+# 每个测试一个事件循环，结束前关掉连接池，避免连接跨循环复用
+def run(coro):
+    from app.db.session import engine, read_engine
+
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+            await read_engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+def add_user(connection, user_id: int, username: str = "user") -> None:
+    connection.execute(
+        "INSERT INTO user (id, email, hashed_password, is_active, is_superuser, is_verified, username, is_premium) "
+        "VALUES (?, ?, 'x', 1, 0, 0, ?, 0)",
+        (user_id, f"{username}{user_id}@example.com", username),
+    )
+    connection.commit()
+
+
+def add_comment(connection, comment_id: int, user_id: int, created_at: str, article_id: str = "a") -> None:
+    connection.execute(
+        "INSERT INTO comment (id, article_id, content, user_id, created_at) VALUES (?, ?, 'c', ?, ?)",
+        (comment_id, article_id, user_id, created_at),
+    )
+    connection.commit()
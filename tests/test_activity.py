@@ -0,0 +1,49 @@
+import pytest
+
+from app.users.activity import decode_cursor, load_activity
+from tests.conftest import add_comment, add_user, run
+
+
+async def collect(user_id: int, limit: int) -> list:
+    from app.db.session import async_session_maker
+
+    seen, after = [], None
+    async with async_session_maker() as session:
+        # 游标不前进时会一直翻下去，页数设上限
+        for _ in range(50):
+            page, cursor = await load_activity(session, user_id, after, limit)
+            seen += [(item["kind"], item["id"]) for item in page]
+            if cursor is None:
+                break
+            after = decode_cursor(cursor)
+    return seen
+
+
+# 只到秒的时间（导入的旧数据）与带小数秒的时间混在一起，同一时刻有多条评论和点赞，逐页翻完不重复不遗漏
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+def test_activity_pages_whole_second_timestamps(db, limit):
+    add_user(db, 1)
+    add_user(db, 2)
+    times = ["2025-01-01 00:00:01", "2025-01-01 00:00:01", "2025-01-01 00:00:01.000000", "2025-01-01 00:00:02", "2025-01-01 00:00:00"]
+    for comment_id, created_at in enumerate(times, start=1):
+        add_comment(db, comment_id, 1, created_at)
+    for comment_id, created_at in enumerate(times, start=1):
+        db.execute("INSERT INTO comment_like (comment_id, user_id, created_at) VALUES (?, 1, ?)", (comment_id, created_at))
+    db.commit()
+
+    seen = run(collect(1, limit))
+    assert len(seen) == len(set(seen)) == 10
+
+
+# 墓碑评论上的点赞不出现在动态里
+def test_activity_hides_likes_on_tombstones(db):
+    add_user(db, 1)
+    add_user(db, 2)
+    add_comment(db, 1, 2, "2025-01-01 00:00:01.000000")
+    add_comment(db, 2, 2, "2025-01-01 00:00:02.000000")
+    for comment_id in (1, 2):
+        db.execute("INSERT INTO comment_like (comment_id, user_id, created_at) VALUES (?, 1, '2025-01-02 00:00:00.000000')", (comment_id,))
+    db.execute("UPDATE comment SET deleted_at = '2025-01-03 00:00:00.000000' WHERE id = 2")
+    db.commit()
+
+    assert run(collect(1, 10)) == [("like", 1)]
@@ -0,0 +1,20 @@
+from tests.conftest import add_comment, add_user
+
+
+def stats(db):
+    return db.execute("SELECT comment_count, last_comment_at FROM article_stats WHERE article_id = 'a'").fetchone()
+
+
+# 删除或软删除最新的评论后，最后评论时间回退到剩余评论中最新的一条
+def test_last_comment_at_follows_delete_and_tombstone(db):
+    add_user(db, 1)
+    add_comment(db, 1, 1, "2025-01-01 00:00:01.000000")
+    add_comment(db, 2, 1, "2025-01-01 00:00:02.000000")
+    add_comment(db, 3, 1, "2025-01-01 00:00:03.000000")
+
+    db.execute("UPDATE comment SET deleted_at = '2025-02-01 00:00:00.000000' WHERE id = 3")
+    assert stats(db) == (2, "2025-01-01 00:00:02.000000")
+    db.execute("DELETE FROM comment WHERE id = 1")
+    assert stats(db) == (1, "2025-01-01 00:00:02.000000")
+    db.execute("DELETE FROM comment WHERE id = 2")
+    assert stats(db) == (0, None)
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from app.users.bulk import extend_premium
+from tests.conftest import add_user, run
+
+
+async def extend(ids: list, days: int, dry_run: bool = False) -> list:
+    from app.db.session import async_session_maker
+
+    async with async_session_maker() as session:
+        items = await extend_premium(session, ids, days, dry_run)
+        await session.commit()
+    return items
+
+
+# 有效会员在原到期时间上续，过期 / 非会员从现在算，永久会员不变；原到期时间只到秒也能正确续期
+def test_extend_premium(db):
+    future = (datetime.now() + timedelta(days=10)).replace(microsecond=0)
+    for user_id in (1, 2, 3, 4):
+        add_user(db, user_id)
+    db.execute("UPDATE user SET is_premium = 1, premium_end_at = NULL WHERE id = 1")
+    db.execute("UPDATE user SET is_premium = 1, premium_end_at = ? WHERE id = 2", (future.strftime("%Y-%m-%d %H:%M:%S"),))
+    db.execute("UPDATE user SET is_premium = 1, premium_end_at = '2020-01-01 00:00:00.000000' WHERE id = 3")
+    db.commit()
+
+    before = datetime.now()
+    items = {item["id"]: item for item in run(extend([1, 2, 3, 4, 5], 30))}
+    assert [items[user_id]["status"] for user_id in (1, 2, 3, 4, 5)] == ["unchanged", "updated", "updated", "updated", "not_found"]
+    assert items[2]["premium_end_at"] == future + timedelta(days=30)
+    for user_id in (3, 4):
+        assert before + timedelta(days=30) <= items[user_id]["premium_end_at"] <= datetime.now() + timedelta(days=30)
+
+    rows = dict(db.execute("SELECT id, premium_end_at FROM user WHERE is_premium = 1").fetchall())
+    assert rows[1] is None
+    assert rows[2] == (future + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S.%f")
+    assert set(rows) == {1, 2, 3, 4}
+
+
+def test_extend_premium_dry_run(db):
+    add_user(db, 1)
+    items = run(extend([1], 7, dry_run=True))
+    assert items[0]["status"] == "updated"
+    assert db.execute("SELECT is_premium, premium_end_at FROM user WHERE id = 1").fetchone() == (0, None)
@@ -0,0 +1,29 @@
+import httpx
+
+from tests.conftest import add_comment, add_user, run
+
+
+async def fetch(headers: dict | None = None) -> httpx.Response:
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/comments/by_article/etag", headers=headers or {})
+
+
+# 另一个连接（其他 worker、脚本）直接写库、本进程没有收到失效通知时，ETag 和内容一起更新，不会把旧内容配上新 ETag
+def test_etag_and_body_change_together_after_external_write(db):
+    add_user(db, 1)
+    add_comment(db, 1, 1, "2025-01-01 00:00:01.000000", article_id="etag")
+
+    first = run(fetch())
+    assert [item["id"] for item in first.json()["items"]] == [1]
+    etag = first.headers["etag"]
+    assert run(fetch({"If-None-Match": etag})).status_code == 304
+
+    add_comment(db, 2, 1, "2025-01-01 00:00:02.000000", article_id="etag")
+    second = run(fetch({"If-None-Match": etag}))
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert [item["id"] for item in second.json()["items"]] == [2, 1]
+
+    assert run(fetch({"If-None-Match": second.headers["etag"]})).status_code == 304
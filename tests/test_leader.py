@@ -0,0 +1,37 @@
+import asyncio
+import os
+import tempfile
+
+from app.bus import InvalidationBus
+from app.users import tasks
+from tests.conftest import run
+
+
+# leader 退出、锁被释放后，原本没拿到锁的 worker 接手定时清理
+def test_leader_loop_takes_over_when_lock_is_released(monkeypatch):
+    directory = tempfile.mkdtemp(prefix="vocabili-leader-")
+    leader = InvalidationBus(directory)
+    assert leader.try_leader()
+
+    started = []
+
+    async def sweep(interval):
+        started.append(interval)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(tasks, "bus", InvalidationBus(directory))
+    monkeypatch.setattr(tasks, "premium_expiry_loop", sweep)
+    monkeypatch.setattr(tasks.settings, "PREMIUM_SWEEP_INTERVAL", 1.0)
+    monkeypatch.setattr(tasks.settings, "PURGE_INTERVAL", 0.0)
+
+    async def scenario():
+        task = asyncio.create_task(tasks.leader_loop(0.01))
+        await asyncio.sleep(0.1)
+        before = list(started)
+        os.close(leader._leader_fd)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return before, list(started)
+
+    assert run(scenario()) == ([], [1.0])
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.likes.buffer import LikeBuffer
+from tests.conftest import add_comment, add_user, run
+
+
+# 写入进行中调用 stop()：这一批以及写入期间新入队的操作都必须落库
+def test_stop_waits_for_inflight_write(db):
+    add_user(db, 1)
+    add_user(db, 2)
+    add_comment(db, 1, 1, "2025-01-01 00:00:00.000000")
+    add_comment(db, 2, 1, "2025-01-01 00:00:01.000000")
+
+    async def scenario():
+        buffer = LikeBuffer(flush_size=1, flush_interval=60)
+        started, release = asyncio.Event(), asyncio.Event()
+        write = buffer._write
+
+        async def blocked_write(batch):
+            started.set()
+            await release.wait()
+            await write(batch)
+
+        buffer._write = blocked_write
+        await buffer.start()
+        buffer.like(1, 2)
+        await asyncio.wait_for(started.wait(), 5)
+
+        stopping = asyncio.create_task(buffer.stop())
+        await asyncio.sleep(0.05)
+        buffer.like(2, 2)
+        release.set()
+        await asyncio.wait_for(stopping, 5)
+        return buffer
+
+    buffer = run(scenario())
+    assert buffer.dropped == 0
+    assert not buffer.running
+    assert db.execute("SELECT comment_id, user_id FROM comment_like ORDER BY comment_id").fetchall() == [(1, 2), (2, 2)]
+    assert db.execute("SELECT id, like_count FROM comment ORDER BY id").fetchall() == [(1, 1), (2, 1)]
+
+
+# flush 被外部取消时，这一批放回队列，不会丢失
+def test_cancelled_flush_keeps_batch(db):
+    async def scenario():
+        buffer = LikeBuffer(flush_size=100, flush_interval=60)
+
+        async def never(batch):
+            await asyncio.Event().wait()
+
+        buffer._write = never
+        buffer.like(1, 1)
+        flushing = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0.05)
+        buffer.unlike(2, 1)
+        flushing.cancel()
+        try:
+            await flushing
+        except asyncio.CancelledError:
+            pass
+        return buffer
+
+    buffer = run(scenario())
+    assert buffer.pending(1, 1) is True
+    assert buffer.pending(2, 1) is False
+    assert buffer.dropped == 0
+
+
+# 入队后评论变成墓碑：缓冲写入既不新增点赞，也不删除墓碑上已有的点赞，计数不变
+def test_buffered_ops_skip_tombstoned_comments(db):
+    add_user(db, 1)
+    add_user(db, 2)
+    add_comment(db, 1, 1, "2025-01-01 00:00:00.000000")
+    add_comment(db, 2, 1, "2025-01-01 00:00:01.000000")
+    add_comment(db, 3, 1, "2025-01-01 00:00:02.000000")
+    db.execute("INSERT INTO comment_like (comment_id, user_id, created_at) VALUES (2, 2, '2025-01-02 00:00:00.000000')")
+    db.execute("UPDATE comment SET like_count = 1 WHERE id = 2")
+    db.commit()
+
+    async def scenario():
+        buffer = LikeBuffer(flush_size=100, flush_interval=60)
+        buffer.like(1, 2)
+        buffer.unlike(2, 2)
+        buffer.like(3, 2)
+        db.execute("UPDATE comment SET deleted_at = '2025-01-03 00:00:00.000000' WHERE id IN (1, 2)")
+        db.commit()
+        await buffer.flush()
+        return buffer
+
+    buffer = run(scenario())
+    assert buffer.dropped == 0
+    assert db.execute("SELECT comment_id, user_id FROM comment_like ORDER BY comment_id").fetchall() == [(2, 2), (3, 2)]
+    assert db.execute("SELECT id, like_count FROM comment ORDER BY id").fetchall() == [(1, 0), (2, 1), (3, 1)]
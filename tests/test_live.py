@@ -0,0 +1,59 @@
+import asyncio
+
+from app.comments.live import live_hub
+from tests.conftest import run
+
+
+def sse_scope(article_id: str) -> dict:
+    path = f"/comments/by_article/{article_id}/events"
+    return {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+
+
+async def never_receive():
+    await asyncio.Event().wait()
+
+
+# 客户端在收到第一条事件前就断开：生成器从未开始执行，订阅也必须释放
+def test_subscriber_released_when_client_leaves_before_first_event():
+    from app.main import app
+
+    async def gone(message):
+        raise OSError("client disconnected")
+
+    async def scenario():
+        for _ in range(3):
+            try:
+                await app(sse_scope("a"), never_receive, gone)
+            except Exception:
+                pass
+        return live_hub.stats()
+
+    stats = run(scenario())
+    assert stats["subscribers"] == 0
+    assert stats["channels"] == 0
+
+
+# 正常收到事件后断开同样释放
+def test_subscriber_released_after_stream_ends():
+    from app.main import app
+
+    async def scenario():
+        received = asyncio.Event()
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                received.set()
+                await asyncio.Event().wait()
+
+        task = asyncio.create_task(app(sse_scope("b"), never_receive, send))
+        await asyncio.wait_for(received.wait(), 5)
+        during = live_hub.stats()["subscribers"]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return during, live_hub.stats()["subscribers"]
+
+    assert run(scenario()) == (1, 0)
@@ -0,0 +1,16 @@
+from app.ratelimit import RateLimiter
+
+
+# 用户桶拒绝的请求不扣 IP 桶，同一 IP 下的其他用户不受影响
+def test_rejected_request_does_not_charge_other_bucket():
+    limiter = RateLimiter(capacity=2, period=3600, max_keys=100)
+    ip = (("ip", "10.0.0.1"), 2.0)
+    assert limiter.acquire((("user", 1), 1.0), ip) == 0
+    assert limiter.acquire((("user", 1), 1.0), ip) == 0
+    for _ in range(10):
+        assert limiter.acquire((("user", 1), 1.0), ip) > 0
+    assert limiter.acquire((("user", 2), 1.0), ip) == 0
+    assert limiter.acquire((("user", 2), 1.0), ip) == 0
+    # IP 桶此时才用完
+    assert limiter.acquire((("user", 3), 1.0), ip) > 0
+    assert limiter.stats()["allowed"] == 4